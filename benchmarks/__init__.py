@@ -0,0 +1 @@
+"""Benchmarks for the Dutch & Dutch API, run from the repository root."""
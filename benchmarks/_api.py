@@ -0,0 +1,24 @@
+"""Load the Dutch & Dutch API without Home Assistant.
+
+The API module only needs aiohttp, but importing it through the
+custom_components package would run the integration's __init__, which
+needs Home Assistant. Instead the package is registered without being
+executed, so the API modules can be imported on their own.
+"""
+
+import importlib
+import importlib.util
+from pathlib import Path
+import sys
+
+PACKAGE = "dutchdutch"
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / PACKAGE
+
+if PACKAGE not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        PACKAGE, PACKAGE_DIR / "__init__.py", submodule_search_locations=[str(PACKAGE_DIR)]
+    )
+    sys.modules[PACKAGE] = importlib.util.module_from_spec(_spec)
+
+dutchdutch_api = importlib.import_module(f"{PACKAGE}.dutchdutch_api")
+DutchDutchApi = dutchdutch_api.DutchDutchApi
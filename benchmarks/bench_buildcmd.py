@@ -0,0 +1,65 @@
+"""Compare the cost of building outgoing commands.
+
+    python -m benchmarks.bench_buildcmd
+
+The baseline is the original buildcmd, which made a fresh uuid4 and
+encoded the whole nested dict with json.dumps for every command.
+"""
+
+import json
+import timeit
+import uuid
+
+from ._api import DutchDutchApi, dutchdutch_api
+
+NUMBER = 100000
+
+
+def buildcmd_baseline(endpoint, datadict, method = 'update', targettype = None, target = None):
+    """The original implementation of DutchDutchApi.buildcmd."""
+    myuuid = str(uuid.uuid4())
+    jsoncommand = {}
+    jsoncommand['meta'] = {}
+    jsoncommand['meta']['id'] = myuuid
+    jsoncommand['meta']['method'] = method
+    jsoncommand['meta']['endpoint'] = endpoint
+    if targettype is not None :
+        jsoncommand['meta']['targetType'] = targettype
+    if target is not None :
+        jsoncommand['meta']['target'] = target
+    jsoncommand['data'] = datadict
+    return json.dumps(jsoncommand), myuuid
+
+
+def main() -> None:
+    """Time a volume command, the one sent most often."""
+    client = DutchDutchApi("localhost", None, None)
+    target = "e5b3c1c4-8d7c-4a2e-9d0f-3b6a1c2d4e5f"
+
+    # make sure both produce the same command apart from the id
+    new = json.loads(client.buildcmd('gain2', {'gain': -30.5},
+                                     targettype = 'room', target = target)[0])
+    old = json.loads(buildcmd_baseline('gain2', {'gain': -30.5},
+                                       targettype = 'room', target = target)[0])
+    del new['meta']['id'], old['meta']['id']
+    assert new == old
+
+    results = {
+        "baseline": timeit.timeit(
+            lambda: buildcmd_baseline('gain2', {'gain': -30.5},
+                                      targettype = 'room', target = target),
+            number=NUMBER),
+        "buildcmd": timeit.timeit(
+            lambda: client.buildcmd('gain2', {'gain': -30.5},
+                                    targettype = 'room', target = target),
+            number=NUMBER),
+    }
+
+    print(f"orjson {'available' if dutchdutch_api.orjson else 'not available'}")
+    for name, total in results.items():
+        print(f"{name:10s} {total / NUMBER * 1e6:7.2f} us/command")
+    print(f"speedup    {results['baseline'] / results['buildcmd']:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare the cost of decoding frames received from the device.
+
+    python -m benchmarks.bench_decode
+
+The baseline is the original ws_receive, which decoded every frame in
+full with json.loads before anything looked at it.
+"""
+
+import json
+import timeit
+
+from ._api import DutchDutchApi, dutchdutch_api
+from .frames import ROOM, sample_traffic
+
+NUMBER = 20
+
+
+def main() -> None:
+    """Time decoding a mix of frames like a busy streaming session produces."""
+    frames = sample_traffic()
+    client = DutchDutchApi("localhost", None, None)
+    client._roomtarget = ROOM  # pylint: disable=protected-access
+
+    wanted = sum(client.decode_frame(frame) is not None for frame in frames)
+
+    def baseline():
+        for frame in frames:
+            json.loads(frame)
+
+    def decode_frame():
+        for frame in frames:
+            client.decode_frame(frame)
+
+    results = {
+        "baseline": timeit.timeit(baseline, number=NUMBER),
+        "decode_frame": timeit.timeit(decode_frame, number=NUMBER),
+    }
+
+    count = len(frames) * NUMBER
+    size = sum(len(frame) for frame in frames) / len(frames)
+    print(f"orjson {'available' if dutchdutch_api.orjson else 'not available'}")
+    print(f"{len(frames)} frames, {size:.0f} bytes average, {wanted} decoded in full")
+    for name, total in results.items():
+        print(f"{name:13s} {total / count * 1e6:8.2f} us/frame")
+    print(f"speedup       {results['baseline'] / results['decode_frame']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Measure the API against mock speaker pairs over real websockets.
+
+    python -m benchmarks.bench_latency [--pairs 4] [--commands 200] [--notifies 2000]
+
+For each simulated pair this reports how long connecting takes, the
+p50/p99 round trip of a volume command sent through async_batch, how
+many network notifications a second the client gets through, and how
+long it takes to come back after the connection is dropped. All the
+pairs are run at once, as they would be in one Home Assistant. The mock
+speakers share the process, so their work is included in the figures.
+
+With --cold each pair gets its own loopback address and the real ports,
+so connecting goes through full discovery. That needs permission to
+listen on port 80.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+
+from ._api import DutchDutchApi
+from .mock_speaker import HTTP_PORT, WS_PORT, MockSpeaker
+
+TIMEOUT = 60
+
+
+def percentiles(samples) -> str:
+    """Return the p50 and p99 of some times in seconds, as milliseconds."""
+    if len(samples) < 2:
+        return "p50 " + (f"{samples[0] * 1e3:8.2f}" if samples else "       -") + " ms"
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return f"p50 {statistics.median(samples) * 1e3:8.2f} ms  p99 {cuts[98] * 1e3:8.2f} ms"
+
+
+async def timed(coro) -> float:
+    """Run a coroutine, returning how long it took."""
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def wait_for(condition) -> None:
+    """Wait until a condition becomes true."""
+    while not condition():
+        await asyncio.sleep(0.001)
+
+
+async def commands(client, count) -> list:
+    """Send volume commands one after another, returning each round trip."""
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        if not await client.async_batch(volume = 0.2 + (i % 40) / 100):
+            raise RuntimeError(f"{client.host}: volume command {i} failed")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def throughput(speaker, client, count) -> float:
+    """Flood a client with notifications, returning how many it handled a second."""
+    handled = 0
+
+    async def counter():
+        nonlocal handled
+        handled += 1
+
+    client.set_push_callback(counter)
+    start = time.perf_counter()
+    await speaker.async_flood(count)
+    await asyncio.wait_for(wait_for(lambda: handled >= count), TIMEOUT)
+    elapsed = time.perf_counter() - start
+    client.set_push_callback(None)
+    return count / elapsed
+
+
+async def reconnect(speaker, client) -> float:
+    """Drop the connection, returning how long the client takes to get it back."""
+    start = time.perf_counter()
+    await speaker.async_disconnect()
+    await asyncio.wait_for(wait_for(lambda: not client.is_available), TIMEOUT)
+    await asyncio.wait_for(wait_for(lambda: client.is_available), TIMEOUT)
+    return time.perf_counter() - start
+
+
+async def run(args) -> None:
+    """Run every measurement on all the pairs at once."""
+    speakers = []
+    for i in range(args.pairs):
+        room = f"{i:08x}-7d4e-4b8a-9c61-2e5f8a0b7d13"
+        if args.cold:
+            speaker = MockSpeaker(f"127.0.0.{i + 2}", HTTP_PORT, WS_PORT, room)
+        else:
+            speaker = MockSpeaker(room = room)
+        speaker.response_delay = args.delay
+        await speaker.async_start()
+        speakers.append(speaker)
+
+    async with aiohttp.ClientSession() as session:
+        clients = []
+        for speaker in speakers:
+            client = DutchDutchApi(speaker.address, session, None)
+            if not args.cold:
+                client.restore_discovery_info(speaker.discovery_info)
+            # measure the round trip, not the rate limiter
+            client.set_max_command_rate(0)
+            clients.append(client)
+
+        try:
+            connect = await asyncio.gather(
+                *(timed(client.async_update()) for client in clients))
+            if not all(client.is_available for client in clients):
+                raise RuntimeError("not every pair connected")
+            latency = await asyncio.gather(
+                *(commands(client, args.commands) for client in clients))
+            rates = await asyncio.gather(
+                *(throughput(speaker, client, args.notifies)
+                  for speaker, client in zip(speakers, clients)))
+            recovery = await asyncio.gather(
+                *(reconnect(speaker, client)
+                  for speaker, client in zip(speakers, clients)))
+        finally:
+            for client in clients:
+                await client.async_close()
+            for speaker in speakers:
+                await speaker.async_stop()
+
+    print(f"{args.pairs} pairs, {args.commands} commands and {args.notifies}"
+          f" notifications each, {args.delay * 1e3:.1f} ms response delay")
+    for i, client in enumerate(clients):
+        print(f"pair {i} ({client.serial})")
+        print(f"  connect    {connect[i] * 1e3:8.2f} ms")
+        print(f"  command    {percentiles(latency[i])}")
+        print(f"  notify     {rates[i]:8.0f} frames/s")
+        print(f"  reconnect  {recovery[i] * 1e3:8.2f} ms")
+    print("all pairs")
+    print(f"  command    {percentiles([t for pair in latency for t in pair])}")
+    print(f"  notify     {sum(rates):8.0f} frames/s")
+
+
+def main() -> None:
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=4)
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--notifies", type=int, default=2000)
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="seconds the speakers wait before each response")
+    parser.add_argument("--cold", action="store_true",
+                        help="connect with full discovery, on the real ports")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Replay a capture through the API, as fast as it will go.
+
+    python -m benchmarks.bench_replay FILE [--repeat 20]
+
+The frames received in the capture are fed to async_ws_listener in
+place of a websocket, with the client set up as it would be once
+subscribed to the room the capture was taken from, and async_update is
+run at the end. Reported are the CPU time per frame, how many frames
+led to a state update, and the memory allocated while replaying, so
+changes to parsing and state handling can be checked against real
+traffic. Make a capture with benchmarks.capture.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import aiohttp
+
+from ._api import DutchDutchApi
+from .capture import read_capture, room_target
+
+
+class ReplaySocket:
+    """Stands in for the websocket, handing out the captured frames."""
+
+    def __init__(self, frames):
+        """Start at the first frame."""
+        self._frames = iter(frames)
+        self.done = asyncio.Event()
+
+    async def receive_str(self) -> str:
+        """Return the next frame, or wait once there are none left."""
+        for frame in self._frames:
+            return frame
+        self.done.set()
+        await asyncio.get_running_loop().create_future()
+        raise aiohttp.ClientConnectionError("end of capture")
+
+    async def send_str(self, data, compress=None) -> None:
+        """Throw away anything the client sends."""
+
+    async def close(self) -> None:
+        """Nothing to close."""
+
+    def get_extra_info(self, name, default=None):
+        """There is no transport."""
+        return default
+
+
+async def replay(frames, room) -> int:
+    """Feed frames through a fresh client, returning how many updates it made."""
+    updates = 0
+
+    async def counter():
+        nonlocal updates
+        updates += 1
+
+    client = DutchDutchApi("replay", None, counter)
+    # as if async_connect had found the room and subscribed to it
+    # pylint: disable=protected-access
+    client._roomtarget = room
+    client._is_available = True
+    client._ws_session = socket = ReplaySocket(frames)
+    client._task = asyncio.get_running_loop().create_task(client.async_ws_listener())
+    await socket.done.wait()
+    await client.async_update()
+    await client.async_close()
+    return updates
+
+
+def main() -> None:
+    """Time replaying a capture, then measure its memory use."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    capture = read_capture(args.file)
+    room = room_target(capture)
+    if room is None:
+        parser.error("the capture doesn't show which room the client used")
+    frames = [frame for _, direction, frame in capture if direction == "rx"]
+    if not frames:
+        parser.error("the capture has no frames from the speakers")
+
+    cpu = time.process_time()
+    for _ in range(args.repeat):
+        updates = asyncio.run(replay(frames, room))
+    cpu = time.process_time() - cpu
+
+    tracemalloc.start()
+    asyncio.run(replay(frames, room))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = sum(len(frame) for frame in frames) / len(frames)
+    print(f"{len(frames)} frames, {size:.0f} bytes average, room {room}")
+    print(f"cpu        {cpu / (len(frames) * args.repeat) * 1e6:8.2f} us/frame")
+    print(f"updates    {updates:8d}")
+    print(f"peak       {peak / 1024:8.1f} KiB allocated")
+    print(f"retained   {current / 1024:8.1f} KiB after the client closed")
+
+
+if __name__ == "__main__":
+    main()
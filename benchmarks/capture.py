@@ -0,0 +1,126 @@
+"""Captures of websocket traffic, as JSON lines.
+
+    python -m benchmarks.capture record HOST FILE [--seconds 60]
+    python -m benchmarks.capture synth FILE
+
+Each line of a capture is one frame, in the order it was seen:
+
+    {"time": 1.234, "direction": "rx", "frame": "{\"meta\": ...}"}
+
+where time is seconds since the capture started, direction is "rx" for
+frames from the speakers and "tx" for frames sent to them, and frame is
+the websocket text exactly as it went over the wire.
+
+record connects to a real speaker pair with DutchDutchApi.set_recorder
+hooked up, and saves everything until the time is up. synth writes the
+synthetic traffic from frames.py in the same format, for when no real
+capture is at hand.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import aiohttp
+
+from ._api import DutchDutchApi
+from .frames import ROOM, sample_traffic
+
+
+class CaptureWriter:
+    """Write frames to a capture file, for use as a DutchDutchApi recorder."""
+
+    def __init__(self, path):
+        """Open the capture file."""
+        self._file = open(path, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+        self._start = time.monotonic()
+        self.frames = 0
+
+    def __call__(self, direction, frame) -> None:
+        """Add a frame to the capture."""
+        self._file.write(json.dumps({
+            "time": round(time.monotonic() - self._start, 6),
+            "direction": direction,
+            "frame": frame,
+        }) + "\n")
+        self.frames += 1
+
+    def close(self) -> None:
+        """Finish the capture."""
+        self._file.close()
+
+
+def read_capture(path) -> list:
+    """Return the frames in a capture, as (time, direction, frame) tuples."""
+    frames = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                frames.append((record["time"], record["direction"], record["frame"]))
+    return frames
+
+
+def room_target(frames) -> str | None:
+    """Return the room that the client in a capture was talking to."""
+    for _, direction, frame in frames:
+        if direction != "tx":
+            continue
+        meta = json.loads(frame).get("meta", {})
+        if meta.get("targetType") == "room" and meta.get("target", "*") != "*":
+            return meta["target"]
+    return None
+
+
+async def record(args) -> None:
+    """Capture the traffic with a real speaker pair."""
+    writer = CaptureWriter(args.file)
+    async with aiohttp.ClientSession() as session:
+        client = DutchDutchApi(args.host, session, None)
+        client.set_recorder(writer)
+        try:
+            if not await client.async_update():
+                print(f"Could not connect to {args.host}")
+                return
+            await asyncio.sleep(args.seconds)
+        finally:
+            await client.async_close()
+            writer.close()
+    print(f"{writer.frames} frames written to {args.file}")
+
+
+def synth(args) -> None:
+    """Write the synthetic sample traffic as a capture."""
+    writer = CaptureWriter(args.file)
+    # the client's side, so the replay can tell which room is ours
+    writer("tx", json.dumps({
+        "meta": {"id": "0", "method": "read", "endpoint": "network",
+                 "targetType": "room", "target": ROOM},
+        "data": {},
+    }))
+    for frame in sample_traffic():
+        writer("rx", frame)
+    writer.close()
+    print(f"{writer.frames} frames written to {args.file}")
+
+
+def main() -> None:
+    """Parse the command line and make a capture."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    parser_record = commands.add_parser("record", help="capture a real speaker pair")
+    parser_record.add_argument("host")
+    parser_record.add_argument("file")
+    parser_record.add_argument("--seconds", type=float, default=60)
+    parser_synth = commands.add_parser("synth", help="write synthetic traffic")
+    parser_synth.add_argument("file")
+    args = parser.parse_args()
+    if args.command == "record":
+        asyncio.run(record(args))
+    else:
+        synth(args)
+
+
+if __name__ == "__main__":
+    main()
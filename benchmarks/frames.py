@@ -0,0 +1,66 @@
+"""Synthetic websocket frames shaped like the ones the speakers send."""
+
+import json
+
+ROOM = "3f1c9a52-7d4e-4b8a-9c61-2e5f8a0b7d13"
+OTHER_ROOM = "8a2d4c6e-1b3f-4e5a-9d7c-0f2e4a6c8b1d"
+
+
+def room_state(gain=-30.0, presets=20, title="Song"):
+    """Return the network state of one room with a realistic amount of detail."""
+    return {
+        "streaming": True,
+        "inputModes": ["analogHighGain", "analogLowGain", "aes",
+                       "Spotify Connect", "Roon Ready"],
+        "selectedInput": "Roon Ready",
+        "selectedXLR": "aes",
+        "sleep": False,
+        "gain": {"global": gain},
+        "mute": {"global": False},
+        "lastSelectedPreset": "preset-0",
+        "preferences": {
+            "gain": {name: {"external": False, "offset": 0.0}
+                     for name in ("analogHighGain", "analogLowGain", "aes")},
+        },
+        "presets": {
+            f"preset-{i}": {
+                "name": f"Preset {i}",
+                "boundary": {"front": 0.4, "rear": 1.2, "side": 2.0},
+                "filters": [{"type": "peaking", "frequency": 40 * (j + 1),
+                             "gain": -1.5, "q": 2.0} for j in range(10)],
+            }
+            for i in range(presets)
+        },
+        "streamingInfo": {
+            "is_playing": True,
+            "display": ["", "", "", f"{title}\nArtist\nAlbum"],
+            "albumArt": {"url": "http://example.com/art.jpg"},
+        },
+    }
+
+
+def network_notify(rooms, **kwargs):
+    """Return a network notification covering the given rooms."""
+    return json.dumps({
+        "meta": {"id": "0", "method": "notify", "type": "network",
+                 "endpoint": "network"},
+        "data": {"state": {room: {"data": room_state(**kwargs)} for room in rooms}},
+    })
+
+
+def other_notify(kind="level"):
+    """Return a notification of a type that the integration ignores."""
+    return json.dumps({
+        "meta": {"id": "0", "method": "notify", "type": kind, "endpoint": kind},
+        "data": {"levels": [[-40.0 + i * 0.1 for i in range(64)] for _ in range(2)]},
+    })
+
+
+def sample_traffic():
+    """Return a mix of frames like a busy streaming session produces."""
+    frames = []
+    for i in range(50):
+        frames.append(network_notify([ROOM, OTHER_ROOM], gain=-30.0 + i * 0.1))
+        frames.append(network_notify([OTHER_ROOM], gain=-20.0))
+        frames.extend(other_notify() for _ in range(4))
+    return frames
@@ -0,0 +1,265 @@
+"""A stand-in for a Dutch & Dutch speaker pair, talking the same protocol.
+
+    python -m benchmarks.mock_speaker [--address 127.0.0.1] [--notify-rate 10]
+
+It serves /clerkip.js over HTTP and the websocket endpoints the
+integration uses, keeping a room state that commands change and that is
+pushed to subscribers as network notifications. How fast notifications
+are sent unprompted, how long responses take and when connections are
+dropped can all be set while it is running.
+
+The real speakers use port 80 for HTTP and 8768 for the websocket. By
+default ports are picked by the system instead, and clients are pointed
+at the websocket with restore_discovery_info, as after a restart.
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+
+from aiohttp import web
+
+from .frames import ROOM, room_state
+
+HTTP_PORT = 80
+WS_PORT = 8768
+
+
+class MockSpeaker:
+    """A speaker pair, as the integration sees it over the network."""
+
+    def __init__(self, address="127.0.0.1", http_port=0, ws_port=0, room=ROOM,
+                 presets=20):
+        """Set up the pair, ports of 0 are picked when it starts."""
+        self.address = address
+        self.http_port = http_port
+        self.ws_port = ws_port
+        self.room = room
+        self.master_target = room + "-master"
+        self.slave_target = room + "-slave"
+        self.serial = "A8-" + room[:8]
+        self.state = room_state(presets=presets)
+        self.state["streamingInfo"]["position"] = 0
+        self.track = 0
+
+        # seconds to wait before answering each request
+        self.response_delay = 0.0
+        # network notifications per second sent without any change being
+        # asked for, as while a track plays. 0 for none.
+        self.notify_rate = 0.0
+
+        self.requests = 0
+        self.frames_sent = 0
+
+        self._sockets = set()
+        self._subscribers = set()
+        self._runner = None
+        self._notifier = None
+
+    @property
+    def discovery_info(self) -> dict:
+        """Return what DutchDutchApi.restore_discovery_info needs to find the pair."""
+        return {
+            "masterurl": f"ws://{self.address}:{self.ws_port}",
+            "ascendurl": f"http://{self.address}",
+            "roomtarget": self.room,
+            "mastertarget": self.master_target,
+            "slavetarget": self.slave_target,
+        }
+
+    async def async_start(self) -> None:
+        """Start listening."""
+        app = web.Application()
+        app.router.add_get("/clerkip.js", self._clerkip)
+        app.router.add_get("/", self._websocket)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+
+        ports = {self.http_port, self.ws_port} if self.http_port else {self.ws_port}
+        for port in ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.address, port))
+            await web.SockSite(self._runner, sock).start()
+            if port == self.ws_port:
+                self.ws_port = sock.getsockname()[1]
+            if port == self.http_port:
+                self.http_port = sock.getsockname()[1]
+
+        self._notifier = asyncio.create_task(self._notify_loop())
+
+    async def async_stop(self) -> None:
+        """Drop every connection and stop listening."""
+        if self._notifier is not None:
+            self._notifier.cancel()
+            self._notifier = None
+        await self.async_disconnect()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def async_disconnect(self) -> None:
+        """Drop every websocket connection, as when the network hiccups."""
+        sockets = list(self._sockets)
+        self._sockets.clear()
+        self._subscribers.clear()
+        await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+
+    async def async_flood(self, count: int) -> None:
+        """Send count network notifications to every subscriber, back to back."""
+        for _ in range(count):
+            self.advance()
+            await self.async_notify()
+
+    def advance(self) -> None:
+        """Move playback on a second, so the next notification has news in it."""
+        self.state["streamingInfo"]["position"] += 1
+
+    async def async_notify(self) -> None:
+        """Send the room state to everyone subscribed."""
+        frame = json.dumps({
+            "meta": {"id": "0", "method": "notify", "type": "network",
+                     "endpoint": "network"},
+            "data": {"state": {self.room: {"data": self.state}}},
+        })
+        for ws in list(self._subscribers):
+            try:
+                await ws.send_str(frame)
+                self.frames_sent += 1
+            except ConnectionError:
+                self._subscribers.discard(ws)
+
+    async def _notify_loop(self) -> None:
+        """Send notifications unprompted, at notify_rate."""
+        while True:
+            if self.notify_rate <= 0:
+                await asyncio.sleep(0.1)
+                continue
+            await asyncio.sleep(1 / self.notify_rate)
+            if self._subscribers:
+                self.advance()
+                await self.async_notify()
+
+    async def _clerkip(self, request) -> web.Response:
+        """Answer the HTTP check that this is a Dutch & Dutch speaker."""
+        return web.Response(text=f"var clerkip = '{self.address}';",
+                            content_type="application/javascript")
+
+    async def _websocket(self, request) -> web.WebSocketResponse:
+        """Handle a websocket connection from a client."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+        try:
+            async for msg in ws:
+                try:
+                    command = json.loads(msg.data)
+                    meta = command["meta"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self.requests += 1
+                if self.response_delay:
+                    await asyncio.sleep(self.response_delay)
+                data, changed = self.handle(meta, command.get("data"), ws)
+                try:
+                    await ws.send_str(json.dumps(
+                        {"meta": {**meta, "method": "response"}, "data": data}))
+                except ConnectionError:
+                    # the client gave up waiting and went away
+                    break
+                self.frames_sent += 1
+                if changed:
+                    await self.async_notify()
+        finally:
+            self._sockets.discard(ws)
+            self._subscribers.discard(ws)
+        return ws
+
+    def handle(self, meta, data, ws) -> tuple:
+        """Act on a request, returning the response data and if the state changed."""
+        endpoint = meta.get("endpoint")
+        method = meta.get("method")
+
+        if endpoint == "master":
+            return {
+                "name": self.serial,
+                "version": "2.0.0",
+                "target": self.master_target,
+                "address": {"ipv4": [self.address], "port_ascend": self.ws_port},
+            }, False
+        if endpoint == "targets":
+            return [
+                {"targetType": "room", "target": self.room},
+                {"targetType": "device", "target": self.master_target},
+                {"targetType": "device", "target": self.slave_target},
+            ], False
+        if endpoint == "network":
+            if method == "subscribe":
+                self._subscribers.add(ws)
+                return {}, False
+            return {"state": {self.room: {"data": self.state}}}, False
+
+        state = self.state
+        try:
+            if endpoint == "gain2":
+                state["gain"]["global"] = data["gain"]
+            elif endpoint == "mute":
+                state["mute"]["global"] = data[0]["mute"]
+            elif endpoint == "preset2":
+                state["lastSelectedPreset"] = data["presetID"]
+            elif endpoint == "selectedInput":
+                state["selectedInput"] = data["input"]
+            elif endpoint == "sleep":
+                state["sleep"] = data["enable"]
+            elif endpoint == "streaming-api":
+                self.streaming_api(data["method"])
+            else:
+                return {}, False
+        except (KeyError, IndexError, TypeError):
+            return {}, False
+        return {}, True
+
+    def streaming_api(self, method) -> None:
+        """Act on a transport control sent to the streamer."""
+        info = self.state["streamingInfo"]
+        if method in ("Play", "Pause"):
+            info["is_playing"] = method == "Play"
+        elif method in ("Next", "Previous"):
+            self.track += 1 if method == "Next" else -1
+            info["display"] = ["", "", "", f"Song {self.track}\nArtist\nAlbum"]
+            info["position"] = 0
+
+
+async def serve(args) -> None:
+    """Run one pair until interrupted."""
+    speaker = MockSpeaker(args.address, args.http_port, args.ws_port)
+    speaker.notify_rate = args.notify_rate
+    speaker.response_delay = args.delay
+    await speaker.async_start()
+    print(f"Serving pair {speaker.serial} on http://{speaker.address}:{speaker.http_port}"
+          f" and ws://{speaker.address}:{speaker.ws_port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await speaker.async_stop()
+
+
+def main() -> None:
+    """Parse the command line and serve a pair."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--http-port", type=int, default=HTTP_PORT)
+    parser.add_argument("--ws-port", type=int, default=WS_PORT)
+    parser.add_argument("--notify-rate", type=float, default=0.0,
+                        help="unprompted notifications per second")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="seconds to wait before each response")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
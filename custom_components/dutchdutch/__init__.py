@@ -3,30 +3,73 @@
 from __future__ import annotations
 
 from .dutchdutch_api import DutchDutchApi
+from .dutchdutch_const import (
+    CONNECT_TIMEOUT,
+    DEFAULT_FRAME_HISTORY,
+    DEFAULT_MAX_COMMAND_RATE,
+    REQUEST_TIMEOUT,
+)
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from .const import (
+    CONF_CONNECT_TIMEOUT,
+    CONF_DISCOVERY,
+    CONF_FRAME_HISTORY,
+    CONF_MAX_COMMAND_RATE,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STATISTICS,
+    DOMAIN,
+)
+from .hub import async_get_hub
 
-PLATFORMS = [Platform.MEDIA_PLAYER]
+PLATFORMS = [Platform.MEDIA_PLAYER, Platform.SENSOR]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Dutch & Dutch from a config entry."""
     session = async_get_clientsession(hass)
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = DutchDutchApi(
-        entry.data[CONF_HOST], session, None
+    client = DutchDutchApi(entry.data[CONF_HOST], session, None)
+    if CONF_DISCOVERY in entry.data:
+        client.restore_discovery_info(entry.data[CONF_DISCOVERY])
+    client.set_max_command_rate(
+        entry.options.get(CONF_MAX_COMMAND_RATE, DEFAULT_MAX_COMMAND_RATE)
     )
+    client.set_frame_history(
+        entry.options.get(CONF_FRAME_HISTORY, DEFAULT_FRAME_HISTORY)
+    )
+    client.set_stats(entry.options.get(CONF_STATISTICS, False))
+    client.set_timeouts(
+        connect=entry.options.get(CONF_CONNECT_TIMEOUT, CONNECT_TIMEOUT),
+        request=entry.options.get(CONF_REQUEST_TIMEOUT, REQUEST_TIMEOUT),
+    )
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = client
+    async_get_hub(hass).async_add_client(client)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    options = dict(entry.options)
+
+    async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Reload the config entry when the options change.
+
+        The cached discovery info is also kept in the entry, so updates to
+        that alone must not cause a reload.
+        """
+        if entry.options != options:
+            await hass.config_entries.async_reload(entry.entry_id)
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload Dutch & Dutch config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        del hass.data[DOMAIN][entry.entry_id]
+        client: DutchDutchApi = hass.data[DOMAIN].pop(entry.entry_id)
+        async_get_hub(hass).async_remove_client(client)
+        await client.async_close()
     return unload_ok
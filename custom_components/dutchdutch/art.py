@@ -0,0 +1,232 @@
+"""Cache of album art shown by Dutch & Dutch media players."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    ART_CACHE_TTL,
+    ART_DISK_CACHE_SIZE,
+    ART_FETCH_TIMEOUT,
+    ART_MAX_IMAGE_SIZE,
+    ART_MEMORY_CACHE_SIZE,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CachedArt:
+    """An image, and what is needed to check it is still current."""
+
+    content: bytes
+    content_type: str | None
+    etag: str | None
+    last_modified: str | None
+    fetched: float
+
+    @property
+    def fresh(self) -> bool:
+        """Return True if the image can be used without checking."""
+        return time.time() - self.fetched < ART_CACHE_TTL
+
+
+class AlbumArtCache:
+    """Keep album art in memory and on disk, keyed by a hash of its url.
+
+    Covers are served from here through Home Assistant's image proxy, so
+    each one is downloaded once however many dashboards show it. Images
+    past their time to live are checked with the server before use, and
+    only downloaded again if they have changed. Requests for an image
+    already being fetched wait for that fetch.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._hass = hass
+        self._path = hass.config.path(".cache", DOMAIN, "art")
+        self._memory: OrderedDict[str, CachedArt] = OrderedDict()
+        self._fetches: dict[str, asyncio.Future[CachedArt | None]] = {}
+
+    async def async_get(self, url: str) -> tuple[bytes | None, str | None]:
+        """Return the image at a url, and its content type."""
+
+        key = hashlib.sha256(url.encode()).hexdigest()
+        if (art := self._memory.get(key)) is not None and art.fresh:
+            self._memory.move_to_end(key)
+            return art.content, art.content_type
+
+        if (pending := self._fetches.get(key)) is not None:
+            art = await asyncio.shield(pending)
+        else:
+            future = self._hass.loop.create_future()
+            self._fetches[key] = future
+            art = None
+            try:
+                art = await self._async_load(key, url)
+            finally:
+                del self._fetches[key]
+                future.set_result(art)
+
+        if art is None:
+            return None, None
+        return art.content, art.content_type
+
+    async def _async_load(self, key: str, url: str) -> CachedArt | None:
+        """Find an image in the cache, fetching or revalidating it as needed."""
+
+        art = self._memory.get(key)
+        if art is None:
+            art = await self._hass.async_add_executor_job(self._read, key)
+        if art is not None and art.fresh:
+            self._remember(key, art)
+            return art
+
+        fetched = await self._async_fetch(url, art)
+        if fetched is None:
+            # better an old cover than none at all
+            if art is not None:
+                self._remember(key, art)
+            return art
+
+        self._remember(key, fetched)
+        await self._hass.async_add_executor_job(
+            self._write, key, fetched, fetched is not art, frozenset(self._memory)
+        )
+        return fetched
+
+    async def _async_fetch(self, url: str, art: CachedArt | None) -> CachedArt | None:
+        """Download an image, or confirm the cached copy is still current."""
+
+        headers = {}
+        if art is not None:
+            if art.etag is not None:
+                headers[aiohttp.hdrs.IF_NONE_MATCH] = art.etag
+            if art.last_modified is not None:
+                headers[aiohttp.hdrs.IF_MODIFIED_SINCE] = art.last_modified
+
+        session = async_get_clientsession(self._hass)
+        try:
+            async with session.get(
+                url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=ART_FETCH_TIMEOUT),
+            ) as response:
+                if response.status == 304 and art is not None:
+                    art.fetched = time.time()
+                    return art
+                if response.status != 200:
+                    _LOGGER.debug("Album art %s: status %d", url, response.status)
+                    return None
+                if (response.content_length or 0) > ART_MAX_IMAGE_SIZE:
+                    return None
+                # read() only returns what has arrived so far, so collect
+                # the chunks until the body ends
+                content = bytearray()
+                async for chunk in response.content.iter_any():
+                    content += chunk
+                    if len(content) > ART_MAX_IMAGE_SIZE:
+                        return None
+                return CachedArt(
+                    bytes(content),
+                    response.content_type,
+                    response.headers.get(aiohttp.hdrs.ETAG),
+                    response.headers.get(aiohttp.hdrs.LAST_MODIFIED),
+                    time.time(),
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Album art %s: fetch failed: %s", url, err)
+            return None
+
+    def _remember(self, key: str, art: CachedArt) -> None:
+        """Put an image in the memory cache, dropping the least recently used."""
+        self._memory[key] = art
+        self._memory.move_to_end(key)
+        while len(self._memory) > ART_MEMORY_CACHE_SIZE:
+            self._memory.popitem(last=False)
+
+    def _read(self, key: str) -> CachedArt | None:
+        """Read an image from the disk cache."""
+        path = os.path.join(self._path, key)
+        try:
+            with open(path + ".json", encoding="utf-8") as file:
+                meta = json.load(file)
+            with open(path, "rb") as file:
+                content = file.read()
+            # the image's time is when it was last used, for _trim
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            return CachedArt(
+                content,
+                meta["content_type"],
+                meta["etag"],
+                meta["last_modified"],
+                meta["fetched"],
+            )
+        except (KeyError, TypeError):
+            return None
+
+    def _write(
+        self, key: str, art: CachedArt, new_content: bool, in_memory: frozenset[str]
+    ) -> None:
+        """Save an image to the disk cache, dropping the least recently used."""
+        path = os.path.join(self._path, key)
+        meta = {
+            "content_type": art.content_type,
+            "etag": art.etag,
+            "last_modified": art.last_modified,
+            "fetched": art.fetched,
+        }
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            if new_content:
+                with open(path, "wb") as file:
+                    file.write(art.content)
+            else:
+                os.utime(path)
+            with open(path + ".json", "w", encoding="utf-8") as file:
+                json.dump(meta, file)
+            self._trim(in_memory)
+        except OSError as err:
+            _LOGGER.debug("Album art cache could not be written: %s", err)
+
+    def _trim(self, in_memory: frozenset[str]) -> None:
+        """Remove the images used longest ago, past the disk cache size.
+
+        An image's modification time is when it was last read or checked,
+        and images held in memory are still in use however old that is.
+        """
+        with os.scandir(self._path) as entries:
+            images = [
+                (
+                    math.inf if entry.name in in_memory else entry.stat().st_mtime,
+                    entry.path,
+                )
+                for entry in entries
+                if not entry.name.endswith(".json")
+            ]
+        if len(images) <= ART_DISK_CACHE_SIZE:
+            return
+        images.sort()
+        for _, path in images[: len(images) - ART_DISK_CACHE_SIZE]:
+            for name in (path, path + ".json"):
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
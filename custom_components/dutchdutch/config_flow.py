@@ -8,15 +8,49 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant.components import zeroconf
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_HOST, CONF_NAME
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .const import DOMAIN
-from .dutchdutch_api import DutchDutchApi
+from homeassistant.core import callback
+
+from .const import (
+    CONF_CONNECT_TIMEOUT,
+    CONF_FRAME_HISTORY,
+    CONF_MAX_COMMAND_RATE,
+    CONF_PUSH_COOLDOWN,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STATISTICS,
+    DEFAULT_PUSH_COOLDOWN,
+    DOMAIN,
+)
+from .dutchdutch_const import (
+    CONNECT_TIMEOUT,
+    DEFAULT_FRAME_HISTORY,
+    DEFAULT_MAX_COMMAND_RATE,
+    REQUEST_TIMEOUT,
+)
+from .hub import async_get_hub
 
 LOGGER = logging.getLogger(__package__)
 
+# Shorter zeroconf property values, such as versions and models, are
+# shared by every pair so can't tell us which one a speaker is in
+MIN_IDENTIFIER_LENGTH = 8
+
+
+def _discovery_identifiers(discovery_info: zeroconf.ZeroconfServiceInfo) -> list[str]:
+    """Return what a speaker was announced with that might identify its pair."""
+    values = [discovery_info.name.split(".", 1)[0], *discovery_info.properties.values()]
+    return [
+        value
+        for value in values
+        if isinstance(value, str) and len(value) >= MIN_IDENTIFIER_LENGTH
+    ]
+
 
 class DutchDutchFlowHandler(ConfigFlow, domain=DOMAIN):
     """Config flow for Dutch & Dutch."""
@@ -32,26 +66,32 @@ class DutchDutchFlowHandler(ConfigFlow, domain=DOMAIN):
         """Initialize flow."""
         self._errors: dict[str, str] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return DutchDutchOptionsFlow(config_entry)
+
     async def async_validate_input(self) -> ConfigFlowResult | None:
         """Validate the input using the Dutch & Dutch API."""
 
         self._errors.clear()
-        session = async_get_clientsession(self.hass)
-        client = DutchDutchApi(self._host, session, None)
+        serial = await async_get_hub(self.hass).async_validate(self._host)
 
-        if not await client.async_check_valid() or client.serial is None:
+        if serial is None:
             self._errors["base"] = "cannot_connect"
             LOGGER.error("Cannot connect")
             return None
 
-        self._serial = client.serial
+        # the serial is also used as the device name
+        self._serial = serial
         self._model = self._serial[:2]
         await self.async_set_unique_id(self._serial)
         self._abort_if_unique_id_configured()
 
         return self.async_create_entry(
-            title=client.device_name,
-            data={CONF_HOST: self._host, CONF_NAME: client.device_name},
+            title=self._serial,
+            data={CONF_HOST: self._host, CONF_NAME: self._serial},
         )
 
     async def async_step_user(
@@ -85,15 +125,24 @@ class DutchDutchFlowHandler(ConfigFlow, domain=DOMAIN):
         self._host = discovery_info.hostname
         self._name = discovery_info.name.split(".", 1)[0]
 
-        session = async_get_clientsession(self.hass)
-        client = DutchDutchApi(self._host, session, None)
-
-        if not await client.async_check_valid() or client.serial is None:
+        # if we know the address already, or the speaker was announced with
+        # something we learned from its partner, this is a pair we've seen
+        # before
+        hub = async_get_hub(self.hass)
+        address = str(discovery_info.ip_address)
+        serial = hub.serial_for_host(address)
+        if serial is None:
+            serial = await hub.async_validate(
+                self._host, _discovery_identifiers(discovery_info)
+            )
+
+        if serial is None:
             self._errors["base"] = "cannot_connect"
             LOGGER.debug("Cannot connect during zeroconf")
             return self.async_abort(reason="cannot_connect")
+        hub.async_remember_hosts(serial, self._host, address)
 
-        self._serial = client.serial
+        self._serial = serial
         self._model = self._serial[:2]
         await self.async_set_unique_id(self._serial)
         self._abort_if_unique_id_configured()
@@ -118,3 +167,54 @@ class DutchDutchFlowHandler(ConfigFlow, domain=DOMAIN):
             errors=self._errors,
             last_step=True,
         )
+
+
+class DutchDutchOptionsFlow(OptionsFlow):
+    """Options flow for Dutch & Dutch."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_PUSH_COOLDOWN,
+                        default=options.get(CONF_PUSH_COOLDOWN, DEFAULT_PUSH_COOLDOWN),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                    vol.Required(
+                        CONF_MAX_COMMAND_RATE,
+                        default=options.get(
+                            CONF_MAX_COMMAND_RATE, DEFAULT_MAX_COMMAND_RATE
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=50)),
+                    vol.Required(
+                        CONF_FRAME_HISTORY,
+                        default=options.get(CONF_FRAME_HISTORY, DEFAULT_FRAME_HISTORY),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=200)),
+                    vol.Required(
+                        CONF_CONNECT_TIMEOUT,
+                        default=options.get(CONF_CONNECT_TIMEOUT, CONNECT_TIMEOUT),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=60)),
+                    vol.Required(
+                        CONF_REQUEST_TIMEOUT,
+                        default=options.get(CONF_REQUEST_TIMEOUT, REQUEST_TIMEOUT),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=60)),
+                    vol.Required(
+                        CONF_STATISTICS,
+                        default=options.get(CONF_STATISTICS, False),
+                    ): bool,
+                }
+            ),
+        )
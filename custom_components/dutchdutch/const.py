@@ -5,3 +5,35 @@ from typing import Final
 DOMAIN: Final = "dutchdutch"
 MANUFACTURER: Final = "Dutch & Dutch"
 
+DATA_HUB: Final = f"{DOMAIN}_hub"
+
+# How many speaker pairs may be going through connection setup at once
+MAX_PARALLEL_CONNECTS: Final = 4
+
+SERVICE_SET_STATE: Final = "set_state"
+SERVICE_WIRE_TRACE: Final = "wire_trace"
+ATTR_ENABLED: Final = "enabled"
+ATTR_SAMPLE: Final = "sample"
+
+# Commands to a group of pairs give up on any that haven't finished this
+# long after the slowest pair's request timeout
+GROUP_COMMAND_GRACE: Final = 2
+
+# Album art is kept for up to a week before checking it is still current.
+# Only the most recently shown covers are held in memory, more on disk.
+ART_CACHE_TTL: Final = 7 * 24 * 3600
+ART_MEMORY_CACHE_SIZE: Final = 16
+ART_DISK_CACHE_SIZE: Final = 200
+ART_MAX_IMAGE_SIZE: Final = 4 * 1024 * 1024
+ART_FETCH_TIMEOUT: Final = 10
+
+CONF_CONNECT_TIMEOUT: Final = "connect_timeout"
+CONF_DISCOVERY: Final = "discovery"
+CONF_FRAME_HISTORY: Final = "frame_history"
+CONF_MAX_COMMAND_RATE: Final = "max_command_rate"
+CONF_PUSH_COOLDOWN: Final = "push_cooldown"
+CONF_REQUEST_TIMEOUT: Final = "request_timeout"
+CONF_STATISTICS: Final = "statistics"
+
+# Bursts of push notifications within this many seconds become one state update
+DEFAULT_PUSH_COOLDOWN: Final = 0.5
@@ -1,23 +1,38 @@
 """Class representing a Dutch and Dutch update coordinator."""
 
+import asyncio
 from datetime import timedelta
 import logging
 
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN
+from .const import (
+    CONF_DISCOVERY,
+    CONF_PUSH_COOLDOWN,
+    DEFAULT_PUSH_COOLDOWN,
+    DOMAIN,
+)
 from .dutchdutch_api import DutchDutchApi
+from .hub import async_get_hub
 
 _LOGGER = logging.getLogger(__name__)
 
+# Poll quickly while trying to (re)connect, backing off up to the maximum
 SCAN_INTERVAL = timedelta(seconds=5)
+MAX_RETRY_INTERVAL = timedelta(seconds=60)
+# Once push updates are flowing, polling is only a liveness check
+PUSH_SCAN_INTERVAL = timedelta(seconds=120)
 
 
 class DutchDutchCoordinator(DataUpdateCoordinator[None]):
     """Dutch & Dutch update coordinator."""
 
-    def __init__(self, hass: HomeAssistant, client: DutchDutchApi) -> None:
+    def __init__(
+        self, hass: HomeAssistant, client: DutchDutchApi, entry: ConfigEntry
+    ) -> None:
         """Initialize the coordinator."""
         super().__init__(
             hass,
@@ -27,14 +42,88 @@ class DutchDutchCoordinator(DataUpdateCoordinator[None]):
         )
         self.client = client
         self.client.set_push_callback(self.push_callback)
+        self._entry = entry
+        self._connect_limit = async_get_hub(hass).connect_limit
+        self._failed_polls = 0
+
+        # The first notification goes straight through, any more arriving
+        # within the cooldown are collapsed into a single update at the end.
+        self._push_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=entry.options.get(CONF_PUSH_COOLDOWN, DEFAULT_PUSH_COOLDOWN),
+            immediate=True,
+            function=self._async_push_update,
+        )
 
     async def push_callback(self) -> None:
         """Call back from client when a push notification is received."""
+        await self._push_debouncer.async_call()
+
+    async def _async_push_update(self) -> None:
+        """Pass the pushed state on to the entities."""
+        # the client also calls back when the connection drops
+        self._adjust_update_interval()
+        self._async_save_discovery_info()
         self.async_set_updated_data(True)
 
+    def _async_save_discovery_info(self) -> None:
+        """Keep the discovered master and room targets in the config entry.
+
+        This lets the next startup go straight to the master speaker.
+        """
+        if not self.client.is_available:
+            return
+        info = self.client.discovery_info
+        if self._entry.data.get(CONF_DISCOVERY) != info:
+            self.hass.config_entries.async_update_entry(
+                self._entry, data={**self._entry.data, CONF_DISCOVERY: info}
+            )
+
+    def _adjust_update_interval(self) -> None:
+        """Poll slowly while push is live, and with backoff while it isn't."""
+        if self.client.is_available:
+            self._failed_polls = 0
+            self.update_interval = PUSH_SCAN_INTERVAL
+        else:
+            self.update_interval = min(
+                SCAN_INTERVAL * 2 ** min(self._failed_polls, 8), MAX_RETRY_INTERVAL
+            )
+
+    async def async_shutdown(self) -> None:
+        """Cancel any pending push update."""
+        await super().async_shutdown()
+        self._push_debouncer.async_cancel()
+
     async def _async_setup(self) -> None:
         """Call once at setup time only."""
 
     async def _async_update_data(self) -> None:
-        """Fetch data from API endpoint."""
-        await self.client.async_update()
+        """Fetch data from API endpoint.
+
+        Each attempt is given a deadline, so a pair that accepts connections
+        but never answers can't hold up polling, and not getting an answer
+        in time is reported as a failed update.
+        """
+        connecting = not self.client.is_available
+        deadline = False
+        try:
+            if not connecting:
+                # the state is kept current by push updates
+                async with asyncio.timeout(self.client.update_timeout):
+                    await self.client.async_check_alive()
+            else:
+                async with self._connect_limit:
+                    async with asyncio.timeout(self.client.update_timeout):
+                        await self.client.async_update()
+        except TimeoutError:
+            deadline = True
+
+        if connecting:
+            if not self.client.is_available:
+                self._failed_polls += 1
+            self._async_save_discovery_info()
+        self._adjust_update_interval()
+
+        if deadline or self.client.timed_out:
+            raise UpdateFailed(f"{self.client.host} did not respond in time")
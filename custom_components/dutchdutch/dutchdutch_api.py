@@ -3,14 +3,128 @@
 from __future__ import annotations
 
 import asyncio
+import collections
+import dataclasses
 import datetime
+import itertools
 import json
+import logging
+import random
 import re
+import time
 import uuid
 
 import aiohttp
 
-from .dutchdutch_const import LOGGER, INPUT_TO_SOURCE, MAXGAIN, VALID_STREAMERS
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .dutchdutch_const import (
+    LOGGER,
+    CONNECT_TIMEOUT,
+    DEFAULT_MAX_COMMAND_RATE,
+    HTTP_TIMEOUT,
+    INPUT_TO_SOURCE,
+    MAX_FRAME_HISTORY_LENGTH,
+    MAXGAIN,
+    OPTIMISTIC_ACK_GRACE,
+    OPTIMISTIC_SENT_HISTORY,
+    OPTIMISTIC_TIMEOUT,
+    RECONNECT_MAX_DELAY,
+    RECONNECT_MIN_DELAY,
+    REQUEST_TIMEOUT,
+    TRACE_LENGTH,
+    VALID_STREAMERS,
+)
+from .dutchdutch_stats import DutchDutchStats
+
+# room fields which feed into the input and volume state
+INPUT_FIELDS = frozenset(('selectedInput', 'selectedXLR', 'preferences', 'gain'))
+
+# The room fields each part of the state snapshot is derived from
+SNAPSHOT_FIELDS = {
+    'power_state': frozenset(('sleep',)),
+    'streaming': frozenset(('streaming',)),
+    'playing_state': frozenset(('streaming', 'streamingInfo')),
+    'available_options': frozenset(('streaming',)),
+    'volume_level': INPUT_FIELDS,
+    'is_volume_muted': frozenset(('mute',)),
+    'source_list': frozenset(('inputModes',)),
+    'source': INPUT_FIELDS,
+    'preset_list': frozenset(('presets',)),
+    'preset': frozenset(('presets', 'lastSelectedPreset')),
+    'media_title': INPUT_FIELDS | {'streamingInfo'},
+    'media_artist': frozenset(('streamingInfo',)),
+    'media_album_name': frozenset(('streamingInfo',)),
+    'media_image_url': frozenset(('streaming', 'streamingInfo')),
+    'media_duration': frozenset(('streaming', 'streamingInfo')),
+    'current_position': frozenset(('streaming', 'streamingInfo')),
+    'position_updated_at': frozenset(('streaming', 'streamingInfo')),
+}
+
+# Where streamingInfo may give the track length and position, with what
+# to divide each by to get seconds
+DURATION_KEYS = (('duration', 1), ('duration_ms', 1000), ('durationMs', 1000))
+POSITION_KEYS = (('position', 1), ('position_ms', 1000), ('positionMs', 1000),
+                 ('elapsed', 1))
+# A reported position this many seconds away from where we expect to be is a seek
+POSITION_TOLERANCE = 2
+
+# The device sends the small, flat meta block first, so it can be picked
+# out and looked at without decoding the rest of the frame.
+META_RE = re.compile(r'\{\s*"meta"\s*:\s*(\{[^{}]*\})')
+
+
+def stream_seconds(info, keys) -> float | None:
+    """Return the first of some streamingInfo times that is there, in seconds."""
+    for key, divisor in keys :
+        value = info.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) :
+            return value / divisor
+    return None
+
+
+def json_dumps(obj) -> str:
+    """Encode compact json, using orjson when it's available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def json_loads(data):
+    """Decode json, using orjson when it's available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class DutchDutchState:
+    """Snapshot of everything about the room that a media player shows.
+
+    A new one is made each time the room changes, so readers get
+    precomputed values and can compare snapshots to spot changes.
+    """
+
+    power_state: bool | None = None
+    streaming: bool | None = False
+    playing_state: bool | None = None
+    available_options: tuple | None = None
+    volume_level: float | None = None
+    is_volume_muted: bool | None = None
+    source_list: tuple | None = None
+    source: str | None = None
+    preset_list: tuple | None = None
+    preset: str | None = None
+    media_title: str | None = None
+    media_artist: str | None = None
+    media_album_name: str | None = None
+    media_image_url: str | None = None
+    media_duration: int | None = None
+    current_position: int | None = None
+    position_updated_at: datetime.datetime | None = None
 
 
 class DutchDutchApi:
@@ -26,26 +140,74 @@ class DutchDutchApi:
         self._serial = ""
         self._version = ""
         self._ws_session = None
-        self._network_info = None
+        # only our room's part of the latest network frame is kept
+        self._room_info = None
+        self._frame_history = None
+        self._recorder = None
+        self._stats = None
+        self._http_timeout = HTTP_TIMEOUT
+        self._connect_timeout = CONNECT_TIMEOUT
+        self._request_timeout = REQUEST_TIMEOUT
+        self._timed_out = False
+        self._wire_trace = False
+        self._trace_sample = 1
+        self._trace_count = 0
         self._roomdata = None
+        self._changed_fields = frozenset()
+        self._snapshot = DutchDutchState()
         self._volume = None
         self._muted = False
         self._extgain = True
         self._streaming = False
         self._sources = None
         self._preset = None
+        # pretty source name -> input, and the sorted names
         self._source_list = {}
+        self._source_names = []
+        self._sources_version = 0
+        # preset name -> id, id -> name, and the sorted names
         self._presets = {}
         self._preset_ids = {}
         self._preset_list = []
+        self._presets_version = 0
         self._is_available = False
+        # set once connected, so connecting again counts as a reconnect
+        self._has_connected = False
         self._selected_input = ""
         self._selected_xlr = ""
+        # what is playing, whether it is, and where in it we were when
+        self._track = None
+        self._track_playing = False
+        self._media_duration = None
+        self._current_position = None
+        self._position_updated_at = None
 
         self._task = None
+        self._pending = {}
+        # command ids keep the shape of a uuid, but only the first one is random
+        self._idprefix = str(uuid.uuid4())[:24]
+        self._idcounter = itertools.count()
+        self._cmdtemplates = {}
+        self._command_interval = 1 / DEFAULT_MAX_COMMAND_RATE
+        self._lastsent = {}
+        self._coalesced = {}
+        self._flushtasks = {}
+        self._callback_task = None
+        # room fields changed by our commands ahead of the device confirming them:
+        # field -> (value we expect, device value before, deadline)
+        self._optimistic = {}
+        # field -> the values of it we have sent while it is optimistic
+        self._optimistic_sent = {}
+        self._tracked = {}
+        self._optimistic_timer = None
+        self._confirmed_roomdata = None
+        self._reconnect_task = None
+        self._connect_lock = asyncio.Lock()
+        self._closing = False
 
         self._roomtarget = ""
         self._masterurl = ""
+        self._connurl = ""
         self._ascendurl = ""
         self._masteraddresses = ""
         self._mastertarget = ""
@@ -63,8 +225,9 @@ class DutchDutchApi:
 
         mycmd = self.buildcmd('master', {},
                               method = 'read')
-        await self.ws_send_request(mycmd[0])
-        data = await self.ws_receive(mycmd[1])
+        data = await self.ws_request(mycmd)
+        if data is None :
+            return
 
         try:
             self._serial = data['data']['name']
@@ -98,8 +261,9 @@ class DutchDutchApi:
                               method = 'read',
                               targettype = 'room',
                               target = '*')
-        await self.ws_send_request(mycmd[0])
-        data = await self.ws_receive(mycmd[1])
+        data = await self.ws_request(mycmd)
+        if data is None :
+            return
 
         #
         # we expect an array of responses, one of which is a room, the
@@ -120,23 +284,32 @@ class DutchDutchApi:
         Also return uuid in case caller wants to wait for a matching response.
         """
 
-        myuuid = str(uuid.uuid4())
-        jsoncommand = {}
-        jsoncommand['meta'] = {}
-        jsoncommand['meta']['id'] = myuuid
-        jsoncommand['meta']['method'] = method
-        jsoncommand['meta']['endpoint'] = endpoint
-        if targettype is not None :
-            jsoncommand['meta']['targetType'] = targettype
-        if target is not None :
-            jsoncommand['meta']['target'] = target
-        jsoncommand['data'] = datadict
-        return json.dumps(jsoncommand), myuuid
-
-    async def async_check_valid(self) -> bool | None:
+        myuuid = self._idprefix + format(next(self._idcounter), '012x')
+        if self._stats is not None :
+            self._stats.request(myuuid, endpoint)
+
+        # everything in meta apart from the id is the same each time for a
+        # given endpoint and target, so only encode that once
+        key = (endpoint, method, targettype, target)
+        template = self._cmdtemplates.get(key)
+        if template is None :
+            meta = {'method': method, 'endpoint': endpoint}
+            if targettype is not None :
+                meta['targetType'] = targettype
+            if target is not None :
+                meta['target'] = target
+            template = '",' + json_dumps(meta)[1:-1] + '},"data":'
+            self._cmdtemplates[key] = template
+
+        return '{"meta":{"id":"' + myuuid + template + json_dumps(datadict) + '}', myuuid
+
+    async def async_check_valid(self, keep_open = False, read_targets = False) -> bool | None:
         """Check that the supplied host/IP returns something expected.
 
         Get the master Speaker ID here to allow Zeroconf flow to ignore the other speaker.
+        If keep_open is set and we happen to be talking to the master already, the
+        websocket is left open for the caller to carry on using. If read_targets is
+        set, the room and device targets of the pair are read as well.
         """
 
         resp = await self.get_request("/clerkip.js")
@@ -146,116 +319,774 @@ class DutchDutchApi:
             if not await self.ws_connect() :
                 return False
             await self.getmasterurl()
-            await self._ws_session.close()
-            self._ws_session = None
+            if read_targets and self._masterurl != "" :
+                await self.getroomid()
+            if not keep_open or not self.connected_to_master() :
+                await self.ws_close()
             if self._masterurl != "" :
                 return True
         return False
 
+    def connected_to_master(self) -> bool:
+        """Return true if the open websocket is already to the master speaker."""
+
+        if self._ws_session is None or self._masterurl == "" :
+            return False
+        if self._connurl == self._masterurl :
+            return True
+        # we may have been given a host name rather than an address
+        peer = self._ws_session.get_extra_info('peername')
+        try:
+            return "ws://" + peer[0] + ":" + str(peer[1]) == self._masterurl
+        except (IndexError, TypeError):
+            return False
+
     async def async_ws_listener(self):
-        """Wait for updates from the device."""
+        """Read every frame from the device and dispatch it.
+
+        This is the only reader of the websocket. Responses are matched by
+        id to the requests waiting in ws_request, anything else is treated
+        as a possible notification.
+        """
 
         try:
             LOGGER.debug("Async listener entry")
             while True :
-                rxdata = await self.ws_receive(None)
-                if rxdata is not None :
-                    # Look for a notify response with some useful data in it
-                    resptype = rxdata['meta']['method']
-                    if resptype == "notify" :
-                        if rxdata['meta']['type'] == "network" :
-                            if "state" in rxdata['data'] :
-                                self._network_info = rxdata
-                                await self.async_update()
-                                if self._push_callback is not None:
-                                    await self._push_callback()
-                else :
+                frame = await self.ws_receive()
+                if frame is None :
                     # the device went unreachable, so exit
                     LOGGER.debug("Async listener no response - exiting")
                     return
+                if self._frame_history is not None :
+                    self._frame_history.append(
+                        (time.time(), frame[:MAX_FRAME_HISTORY_LENGTH]))
+
+                rxdata = self.decode_frame(frame)
+                if self._stats is not None :
+                    self._stats.frames_received += 1
+                    if rxdata is None :
+                        self._stats.frames_discarded += 1
+                if rxdata is None :
+                    continue
+
+                try:
+                    meta = rxdata['meta']
+                    if self._stats is not None :
+                        self._stats.received(meta.get('id'))
+                    future = self._pending.pop(meta.get('id'), None)
+                    if future is not None :
+                        if not future.done():
+                            future.set_result(rxdata)
+                        continue
+                    # Look for a notify response with some useful data in it
+                    if meta['method'] == "notify" :
+                        await self.async_handle_notify(rxdata)
+                except (KeyError, TypeError, AttributeError):
+                    LOGGER.debug("Host %s: ignoring unexpected frame", self._host)
 
         except asyncio.CancelledError :
             LOGGER.debug("Async listener cancelled")
 
+    def decode_frame(self, frame) -> dict | None:
+        """Decode a frame from the device, or return None if it isn't wanted.
+
+        Notifications that would only be thrown away by async_handle_notify
+        are spotted from the meta block, and never fully decoded.
+        """
+
+        match = META_RE.match(frame)
+        if match is not None :
+            try:
+                meta = json_loads(match.group(1))
+            except ValueError:
+                meta = None
+            if meta is not None and meta.get('method') == "notify" \
+                    and meta.get('id') not in self._pending :
+                if meta.get('type') != "network" :
+                    return None
+                # nothing in it for us if our room isn't mentioned
+                if self._roomtarget != "" and \
+                        '"' + self._roomtarget + '"' not in frame :
+                    return None
+
+        try:
+            return json_loads(frame)
+        except ValueError:
+            LOGGER.debug("Host %s: ignoring frame that isn't json", self._host)
+            return None
+
+    async def async_handle_notify(self, rxdata) -> None:
+        """Process a notification pushed by the device."""
+
+        if rxdata['meta'].get('type') == "network" :
+            if "state" in rxdata['data'] :
+                if not self.keep_room_info(rxdata) :
+                    return
+                # until the initial read and subscribe are done, just keep
+                # the data, it gets parsed at the end of async_update
+                if not self._is_available:
+                    return
+                changed = self.update_from_network_info()
+                if self._stats is not None :
+                    self._stats.notified(bool(changed))
+                # nothing to tell anyone if the frame didn't change our room
+                if not changed :
+                    return
+                if self._push_callback is not None:
+                    await self._push_callback()
+
     def lost_connection(self) :
         """Tidy up if we lose the connection to the device."""
         LOGGER.debug("Lost connection")
+        was_available = self._is_available
+        if self._stats is not None :
+            self._stats.lost_connection()
         self._is_available = False
-        if self._task is not None and not self._task.done():
+        if self._task is not None and not self._task.done() \
+                and self._task is not asyncio.current_task():
             self._task.cancel()
         self._task = None
         self._ws_session = None
+        self.fail_pending()
+        self._coalesced.clear()
+        self._optimistic_sent.clear()
+        if self._optimistic :
+            self._optimistic.clear()
+            self.set_roomdata(self._confirmed_roomdata)
+        if not was_available or self._closing:
+            return
+        loop = asyncio.get_running_loop()
+        # let the owner know straight away, rather than at its next poll
+        self.schedule_push_callback()
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = loop.create_task(self.async_reconnect())
+
+    def schedule_push_callback(self) -> None:
+        """Call the push callback from code that can't await it."""
+        if self._push_callback is not None:
+            self._callback_task = asyncio.get_running_loop().create_task(
+                self._push_callback())
+
+    @property
+    def reconnecting(self) -> bool:
+        """Return true while the reconnect supervisor is running."""
+        return self._reconnect_task is not None and not self._reconnect_task.done()
+
+    async def async_reconnect(self) -> None:
+        """Re-establish a lost connection, backing off between attempts.
+
+        The random delay stops a rack of speakers coming back from a reboot
+        being hit by every client at the same moment.
+        """
+
+        attempt = 0
+        try:
+            while not self._closing and not self._is_available:
+                limit = min(RECONNECT_MIN_DELAY * 2 ** attempt, RECONNECT_MAX_DELAY)
+                await asyncio.sleep(random.uniform(0, limit))
+                attempt = min(attempt + 1, 16)
+                LOGGER.debug("Host %s: reconnect attempt %d", self._host, attempt)
+                if await self.async_connect() :
+                    self.update_from_network_info()
+                    if self._push_callback is not None:
+                        await self._push_callback()
+        except asyncio.CancelledError:
+            LOGGER.debug("Host %s: reconnect cancelled", self._host)
+
+    async def async_close(self) -> None:
+        """Disconnect for good, stopping any reconnection attempts."""
+
+        self._closing = True
+        task = self._reconnect_task
+        self._reconnect_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._flushtasks.values()):
+            task.cancel()
+        if self._optimistic_timer is not None :
+            self._optimistic_timer.cancel()
+            self._optimistic_timer = None
+        await self.ws_close()
+        self._is_available = False
+
+    async def async_check_alive(self) -> bool:
+        """Check that the device still answers on the current connection."""
+
+        self._timed_out = False
+        if self._ws_session is None or self._ws_session.closed \
+                or self._task is None or self._task.done():
+            self.lost_connection()
+            return False
+
+        mycmd = self.buildcmd('master', {},
+                              method = 'read')
+        if await self.ws_request(mycmd) is None :
+            LOGGER.debug("Host %s: liveness check failed", self._host)
+            await self.ws_close()
+            self.lost_connection()
+            return False
+        return True
+
+    def fail_pending(self) -> None:
+        """Wake up anything still waiting for a response that will never come."""
+        pending = self._pending
+        self._pending = {}
+        for future in pending.values():
+            if not future.done():
+                future.set_result(None)
 
     def set_push_callback(self, push_callback) -> None:
         """Provide callback routine for push updates."""
         self._push_callback = push_callback
 
+    def set_recorder(self, recorder) -> None:
+        """Pass every websocket frame to recorder(direction, frame), or stop if None.
+
+        The direction is "tx" for frames sent and "rx" for frames received.
+        """
+        self._recorder = recorder
+
+    def set_wire_trace(self, enabled: bool, sample: int = 1) -> None:
+        """Log frames sent and received in full, or stop.
+
+        Only one frame in every sample is logged, whether tracing or not.
+        """
+        self._wire_trace = enabled
+        self._trace_sample = max(sample, 1)
+        self._trace_count = 0
+        LOGGER.info("Host %s: wire trace %s", self._host, "on" if enabled else "off")
+
+    def trace_frame(self, direction, frame) -> None:
+        """Log a frame, unless sampling skips it.
+
+        Callers check the wire trace is on or debug logging is enabled
+        first, so nothing is done for frames that wouldn't be logged.
+        """
+        self._trace_count += 1
+        if self._trace_count % self._trace_sample :
+            return
+        if self._wire_trace :
+            LOGGER.info("Host %s: %s %s", self._host, direction, frame)
+        else :
+            LOGGER.debug("Host %s: %s %s", self._host, direction, frame[:TRACE_LENGTH])
+
+    def set_timeouts(self, connect = None, request = None, http = None) -> None:
+        """Set how many seconds each kind of operation may take."""
+        if connect is not None :
+            self._connect_timeout = connect
+        if request is not None :
+            self._request_timeout = request
+        if http is not None :
+            self._http_timeout = http
+
+    @property
+    def request_timeout(self) -> float:
+        """Return how long the device is given to answer a request."""
+        return self._request_timeout
+
+    @property
+    def update_timeout(self) -> float:
+        """Return the longest that connecting should take.
+
+        The worst case is the cached master being tried first, with its
+        websocket, master check and room read, and then full discovery:
+        the HTTP check, the websockets to the host and the master, and the
+        master, targets and room reads over them.
+        """
+        cached = self._connect_timeout + 2 * self._request_timeout
+        discovery = self._http_timeout + 2 * self._connect_timeout \
+            + 3 * self._request_timeout
+        return cached + discovery
+
+    @property
+    def timed_out(self) -> bool:
+        """Return True if the last connect or liveness check failed for want of an answer."""
+        return self._timed_out
+
+    def set_stats(self, enabled: bool) -> None:
+        """Turn the collection of statistics on or off."""
+        if not enabled :
+            self._stats = None
+        elif self._stats is None :
+            self._stats = DutchDutchStats()
+
+    @property
+    def stats(self) -> DutchDutchStats | None:
+        """Return the statistics collected, or None if they're turned off."""
+        return self._stats
+
     async def async_update(self) -> bool | None:
-        """Get the latest details from the device."""
+        """Connect if need be, and bring the room state up to date."""
 
         # first time through, check it's up and read required initial data. If anything
-        # goes wrong here, it will try again on the next poll
+        # goes wrong here, it will try again on the next poll. Once a connection has
+        # been made, losing it is dealt with by the reconnect supervisor.
         if not self._is_available:
-            # HTTP get to check reachable, and find master
-            if not await self.async_check_valid() :
-                return False
-            # WS connect to master speaker
-            if not await self.ws_connect() :
+            if self.reconnecting :
+                return True
+            if not await self.async_connect() :
                 return False
-            await self.getroomid()
 
-            # most of the interesting data is in the network endpoint
-            mycmd = self.buildcmd('network', {},
-                                  method = 'read',
-                                  targettype = 'room',
-                                  target = self._roomtarget)
-            await self.ws_send_request(mycmd[0])
-            data = await self.ws_receive(mycmd[1])
-            if data is not None and data['meta']['endpoint'] == 'network' :
-                self._network_info = data
-                # from now on, we just listen for change notifications
-                loop = asyncio.get_running_loop()
-                self._task = loop.create_task(self.async_ws_listener())
-                mycmd = self.buildcmd('network', {},
-                                  method = 'subscribe')
-                await self.ws_send_request(mycmd[0])
-                self._is_available = True
-
-        # One of the above calls failed
-        if not self._is_available:
+        self.update_from_network_info()
+        return True
+
+    async def async_connect(self) -> bool:
+        """Connect to the master speaker and subscribe to network updates."""
+
+        async with self._connect_lock:
+            if self._is_available:
+                return True
+            self._timed_out = False
+            try:
+                if not await self.async_connect_master() :
+                    return False
+            except asyncio.CancelledError:
+                # don't leave a half set up connection behind
+                if not self._is_available :
+                    await self.ws_close()
+                raise
+            # a timeout on the way doesn't matter if we got there in the end
+            self._timed_out = False
+            if self._has_connected and self._stats is not None :
+                self._stats.reconnects += 1
+            self._has_connected = True
             return True
 
+    async def async_connect_master(self) -> bool:
+        """Find the master speaker, connect and subscribe, holding the connect lock."""
+
+        # If we have been connected before, go straight to the master
+        if self._masterurl != "" and self._roomtarget != "" :
+            cachedurl = self._masterurl
+            if await self.ws_connect() :
+                if self._serial == "" :
+                    # first time since a restart, check it's still the master
+                    await self.getmasterurl()
+                if self._masterurl == cachedurl and await self.async_subscribe() :
+                    return True
+                await self.ws_close()
+            # it may have moved, so start again from the configured host
+            self._masterurl = ""
+
+        # HTTP get to check reachable, and find master
+        if not await self.async_check_valid(keep_open = True) :
+            return False
+        # WS connect to master speaker, unless that's where we already are
+        if self._ws_session is None and not await self.ws_connect() :
+            return False
+        await self.getroomid()
+        if not await self.async_subscribe() :
+            await self.ws_close()
+            return False
+        return True
+
+    async def async_subscribe(self) -> bool:
+        """Read the room state and subscribe to network change notifications."""
+
+        # most of the interesting data is in the network endpoint
+        mycmd = self.buildcmd('network', {},
+                              method = 'read',
+                              targettype = 'room',
+                              target = self._roomtarget)
+        data = await self.ws_request(mycmd)
+        if data is None or data['meta'].get('endpoint') != 'network' :
+            return False
+        self.keep_room_info(data)
+        # from now on, we just listen for change notifications
+        mycmd = self.buildcmd('network', {},
+                          method = 'subscribe')
+        if not await self.ws_send_request(mycmd[0]) :
+            return False
+        self._is_available = True
+        return True
+
+    def keep_room_info(self, data) -> bool:
+        """Keep our room's part of a network frame, and let go of the rest.
+
+        Returns False if the frame has nothing for our room.
+        """
+        try:
+            self._room_info = data['data']['state'][self._roomtarget]['data']
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def update_from_network_info(self) -> frozenset:
+        """Derive the room state from the latest network data.
+
+        Only the room fields that differ from the previous frame are
+        re-derived. The names of those fields are returned, and are also
+        available afterwards from changed_fields.
+        """
+
         # If the expected data isn't there, it's a transient condition and
         # will be resolved by an overall connection success/failure soon
+        roomdata = self._room_info
+        if roomdata is None :
+            self._changed_fields = frozenset()
+            return self._changed_fields
+
+        self._confirmed_roomdata = roomdata
+        # An optimistic value is kept while the device still reports what it
+        # had before the command, or a value we sent on the way to it, or
+        # while the latest value is still held back by the rate limiter. If
+        # it reports the latest value or anything else, the device is right.
+        now = time.monotonic()
+        for field, (value, before, deadline) in list(self._optimistic.items()):
+            reported = roomdata.get(field)
+            if now <= deadline and reported != value and (
+                    reported == before
+                    or reported in self._optimistic_sent.get(field, ())
+                    or self.is_coalescing(field)) :
+                continue
+            del self._optimistic[field]
+            self._optimistic_sent.pop(field, None)
+
+        return self.set_roomdata(self.merge_optimistic(roomdata))
+
+    def set_roomdata(self, roomdata) -> frozenset:
+        """Make roomdata current, re-deriving only what changed.
+
+        If the data turns out to be malformed, it is thrown away and the
+        previous room data, and everything derived from it, is kept.
+        """
+
+        if self._stats is not None :
+            start = time.perf_counter()
+        oldroomdata = self._roomdata
+        if oldroomdata is None :
+            changed = frozenset(roomdata)
+        else :
+            changed = frozenset(
+                field for field in roomdata.keys() | oldroomdata.keys()
+                if roomdata.get(field) != oldroomdata.get(field))
+
+        # the snapshot is built from properties that read _roomdata
+        self._roomdata = roomdata
         try:
-            self._roomdata = \
-            self._network_info['data']['state'][self._roomtarget]['data']
-        except KeyError:
-            return True
+            self.derive_roomdata(roomdata, changed)
+        except (KeyError, IndexError, TypeError, AttributeError) as err:
+            LOGGER.debug("Host %s: ignoring malformed room data: %r", self._host, err)
+            self._roomdata = oldroomdata
+            if oldroomdata is not None :
+                # undo whatever was derived before it went wrong
+                self.derive_roomdata(oldroomdata, changed)
+            changed = frozenset()
+        self._changed_fields = changed
+
+        if self._stats is not None :
+            self._stats.update_time.add(time.perf_counter() - start)
+        return changed
+
+    def derive_roomdata(self, roomdata, changed) -> None:
+        """Work out everything that depends on the changed room fields."""
+
+        if 'streaming' in changed :
+            self._streaming = roomdata['streaming']
+
+        if 'inputModes' in changed :
+            self.update_sources(roomdata.get('inputModes'))
+
+        if not changed.isdisjoint(INPUT_FIELDS) :
+            self._selected_input = roomdata['selectedInput']
+            self._selected_xlr = roomdata['selectedXLR']
+
+            self._extgain = False
+            if self._selected_input == "XLR" :
+                self._extgain = \
+                    roomdata['preferences']['gain'][self._selected_xlr]['external']
+                if self._extgain :
+                    self._volume = 0
+            else:
+                self._volume = roomdata['gain']['global']
 
-        self._streaming = self._roomdata['streaming']
-        self._sources = self._roomdata['inputModes']
-        self._selected_input = self._roomdata['selectedInput']
-        self._selected_xlr = self._roomdata['selectedXLR']
-
-        self._extgain = False
-        if self._selected_input == "XLR" :
-            self._extgain = \
-                self._roomdata['preferences']['gain'][self._selected_xlr]['external']
-            if self._extgain :
-                self._volume = 0
-        else:
-            self._volume = self._roomdata['gain']['global']
+        if 'presets' in changed :
+            self.update_presets(roomdata.get('presets'))
 
-        # get the list of possible presets and create two mappings
-        for prid in self._roomdata['presets'] :
-            prn = self._roomdata['presets'][prid]['name']
-            self._presets[prn] = prid
+        if 'lastSelectedPreset' in changed :
+            self._preset = roomdata['lastSelectedPreset']
+
+        if 'streaming' in changed or 'streamingInfo' in changed :
+            self.update_position(roomdata)
+
+        self.update_snapshot(changed)
+
+    def update_position(self, roomdata) -> None:
+        """Work out the position in the track, and when it was valid.
+
+        The device's own figures are used if streamingInfo has them.
+        Otherwise the position is counted from the start of the track,
+        pausing when playback does, once a track has been seen to start.
+        The time it was valid only moves on when the position jumps, so
+        Home Assistant can move it along in between.
+        """
+
+        info = roomdata.get('streamingInfo') if self._streaming else None
+        if not isinstance(info, dict) :
+            self._track = None
+            self._media_duration = None
+            self._current_position = None
+            self._position_updated_at = None
+            return
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        track = (self.media_title, self.media_artist, self.media_album_name)
+        playing = bool(info.get('is_playing'))
+        position = stream_seconds(info, POSITION_KEYS)
+        self._media_duration = stream_seconds(info, DURATION_KEYS)
+
+        # where we would be now if nothing had changed
+        expected = self._current_position
+        if expected is not None and self._track_playing :
+            expected += (now - self._position_updated_at).total_seconds()
+
+        if position is not None :
+            if expected is None or playing != self._track_playing \
+                    or abs(position - expected) > POSITION_TOLERANCE :
+                self._current_position = position
+                self._position_updated_at = now
+        elif track != self._track :
+            # only a track change we saw happen tells us where we are
+            if self._track is None :
+                self._current_position = None
+                self._position_updated_at = None
+            else :
+                self._current_position = 0
+                self._position_updated_at = now
+        elif playing != self._track_playing and expected is not None :
+            self._current_position = expected
+            self._position_updated_at = now
+
+        self._track = track
+        self._track_playing = playing
+
+    def update_sources(self, sources) -> None:
+        """Rebuild the source map from the device's input modes."""
+
+        self._sources = sources
+        source_list = {}
+        for source in sources or () :
+            if source in INPUT_TO_SOURCE :
+                source_list[INPUT_TO_SOURCE[source]] = source
+        if source_list != self._source_list :
+            self._source_list = source_list
+            self._source_names = sorted(source_list)
+            self._sources_version += 1
+
+    def update_presets(self, presets) -> None:
+        """Bring the preset maps in line with the device's presets.
+
+        Only presets which have been added, renamed or deleted are touched.
+        """
+
+        if not isinstance(presets, dict) :
+            presets = {}
+        changed = False
+
+        for prid in self._preset_ids.keys() - presets.keys() :
+            self.forget_preset_name(prid, self._preset_ids.pop(prid))
+            changed = True
+
+        for prid, preset in presets.items() :
+            try:
+                prn = preset['name']
+            except (KeyError, TypeError):
+                continue
+            oldprn = self._preset_ids.get(prid)
+            if oldprn == prn :
+                continue
             self._preset_ids[prid] = prn
+            if oldprn is not None :
+                self.forget_preset_name(prid, oldprn)
+            self._presets[prn] = prid
+            changed = True
 
-        self._preset = self._roomdata['lastSelectedPreset']
+        if changed :
+            self._preset_list = sorted(self._presets)
+            self._presets_version += 1
 
-        return True
+    def forget_preset_name(self, prid, prn) -> None:
+        """Drop the name a preset had, unless another preset shares it."""
+
+        if self._presets.get(prn) != prid :
+            return
+        del self._presets[prn]
+        for otherid, othername in self._preset_ids.items() :
+            if othername == prn :
+                self._presets[prn] = otherid
+                return
+
+    @property
+    def sources_version(self) -> int:
+        """Return a number which goes up each time the source list changes."""
+        return self._sources_version
+
+    @property
+    def presets_version(self) -> int:
+        """Return a number which goes up each time the preset list changes."""
+        return self._presets_version
+
+    def update_snapshot(self, changed) -> None:
+        """Replace the parts of the state snapshot that depend on changed fields."""
+
+        updates = {}
+        for name, fields in SNAPSHOT_FIELDS.items():
+            if not changed.isdisjoint(fields) :
+                value = getattr(self, name)
+                updates[name] = tuple(value) if isinstance(value, list) else value
+        if updates :
+            self._snapshot = dataclasses.replace(self._snapshot, **updates)
+
+    @property
+    def snapshot(self) -> DutchDutchState:
+        """Return the current state of the room, as a snapshot."""
+        return self._snapshot
+
+    def merge_optimistic(self, roomdata) -> dict:
+        """Return the device's room data with our unconfirmed changes on top."""
+        if not self._optimistic :
+            return roomdata
+        merged = dict(roomdata)
+        for field, (value, _, _) in self._optimistic.items():
+            merged[field] = value
+        return merged
+
+    async def async_apply_optimistic(self, field, value) -> tuple:
+        """Show a change to a room field before the device confirms it.
+
+        Returns the fields to pass on with the command, so they can be rolled
+        back if it fails.
+        """
+
+        if self._roomdata is None or self._confirmed_roomdata is None :
+            return ()
+        before = self._optimistic[field][1] if field in self._optimistic \
+            else self._confirmed_roomdata.get(field)
+        deadline = time.monotonic() + OPTIMISTIC_TIMEOUT
+        self._optimistic[field] = (value, before, deadline)
+        self.schedule_optimistic_expiry()
+
+        if self.set_roomdata(self.merge_optimistic(self._confirmed_roomdata)) :
+            if self._push_callback is not None:
+                await self._push_callback()
+        return (field,)
+
+    def track_command(self, myuuid, fields, always = False) -> asyncio.Future | None:
+        """Watch for the device's response to a command with optimistic fields.
+
+        Commands without any are only watched if always is set, in which case
+        the caller must stop waiting for the response itself.
+        """
+
+        if not fields and not always :
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._pending[myuuid] = future
+        if fields :
+            self._tracked[myuuid] = fields
+            # the device may echo these before it gets to later ones
+            for field in fields:
+                if field in self._optimistic :
+                    sent = self._optimistic_sent.get(field)
+                    if sent is None :
+                        sent = self._optimistic_sent[field] = collections.deque(
+                            maxlen = OPTIMISTIC_SENT_HISTORY)
+                    sent.append(self._optimistic[field][0])
+            future.add_done_callback(
+                lambda fut: self.command_done(myuuid, fut))
+        return future
+
+    def command_done(self, myuuid, future) -> None:
+        """Act on the response to a tracked command, or the lack of one."""
+
+        fields = self._tracked.pop(myuuid, ())
+        if future.cancelled() :
+            return
+        if future.result() is None :
+            # the command never made it, so neither did the change
+            self.rollback_optimistic(fields)
+            return
+        # it has been acted on, so the notification should be close behind
+        deadline = time.monotonic() + OPTIMISTIC_ACK_GRACE
+        for field in fields:
+            if field in self._optimistic :
+                value, before, olddeadline = self._optimistic[field]
+                self._optimistic[field] = (value, before, min(olddeadline, deadline))
+        self.schedule_optimistic_expiry()
+
+    def rollback_optimistic(self, fields) -> None:
+        """Go back to what the device last told us for these fields."""
+
+        dropped = False
+        for field in fields:
+            self._optimistic_sent.pop(field, None)
+            if self._optimistic.pop(field, None) is not None :
+                dropped = True
+        if dropped and self._confirmed_roomdata is not None :
+            if self.set_roomdata(self.merge_optimistic(self._confirmed_roomdata)) :
+                self.schedule_push_callback()
+
+    def schedule_optimistic_expiry(self) -> None:
+        """Arrange for expire_optimistic to run at the earliest deadline."""
+
+        if self._optimistic_timer is not None :
+            self._optimistic_timer.cancel()
+            self._optimistic_timer = None
+        if self._optimistic :
+            deadline = min(entry[2] for entry in self._optimistic.values())
+            self._optimistic_timer = asyncio.get_running_loop().call_later(
+                max(deadline - time.monotonic(), 0), self.expire_optimistic)
+
+    def expire_optimistic(self) -> None:
+        """Roll back changes the device hasn't confirmed in time."""
+
+        self._optimistic_timer = None
+        now = time.monotonic()
+        self.rollback_optimistic([
+            field for field, entry in self._optimistic.items() if now >= entry[2]])
+
+        # stop waiting for responses to commands that no longer matter
+        for myuuid, fields in list(self._tracked.items()):
+            if self._optimistic.keys().isdisjoint(fields) :
+                future = self._pending.pop(myuuid, None)
+                if future is not None :
+                    future.cancel()
+                self._tracked.pop(myuuid, None)
+        self.schedule_optimistic_expiry()
+
+    @property
+    def changed_fields(self) -> frozenset:
+        """Return the room fields that changed in the last network update."""
+        return self._changed_fields
+
+    @property
+    def discovery_info(self) -> dict:
+        """Return what was found out about the pair, to be cached across restarts."""
+        return {
+            "masterurl": self._masterurl,
+            "ascendurl": self._ascendurl,
+            "roomtarget": self._roomtarget,
+            "mastertarget": self._mastertarget,
+            "slavetarget": self._slavetarget,
+        }
+
+    def restore_discovery_info(self, info) -> None:
+        """Start from previously cached discovery info.
+
+        It is tried first on the next connect, and thrown away if that fails.
+        """
+        try:
+            self._masterurl = info['masterurl']
+            self._ascendurl = info['ascendurl']
+            self._roomtarget = info['roomtarget']
+            self._mastertarget = info['mastertarget']
+            self._slavetarget = info['slavetarget']
+        except (KeyError, TypeError):
+            LOGGER.debug("Host %s: ignoring bad cached discovery info", self._host)
 
     @property
     def is_available(self) -> bool | None:
@@ -270,6 +1101,26 @@ class DutchDutchApi:
         except (KeyError, TypeError):
             return None
 
+    @property
+    def host(self) -> str:
+        """Return the host we were configured with."""
+        return self._host
+
+    @property
+    def master_addresses(self) -> list:
+        """Return the IPv4 addresses reported by the master speaker."""
+        try:
+            return list(self._masteraddresses['ipv4'])
+        except (KeyError, TypeError):
+            return []
+
+    @property
+    def pair_targets(self) -> list:
+        """Return the room and device targets of the pair, as far as they're known."""
+        return [target
+                for target in (self._roomtarget, self._mastertarget, self._slavetarget)
+                if target != ""]
+
     @property
     def serial(self) -> str | None:
         """Return the serial."""
@@ -349,16 +1200,9 @@ class DutchDutchApi:
     @property
     def source_list(self) -> list | None:
         """Return the list of supported input sources."""
-
-        if self._sources is None or len(self._source_list) > 0:
-            return sorted(self._source_list)
-
-        for source in self._sources :
-            for name, pretty_name in INPUT_TO_SOURCE.items():
-                if name == source :
-                    self._source_list[pretty_name] = name
-
-        return sorted(self._source_list)
+        if self._sources is None :
+            return None
+        return self._source_names
 
     @property
     def source(self) -> str | None:
@@ -423,35 +1267,26 @@ class DutchDutchApi:
     @property
     def media_duration(self) -> int | None:
         """Duration of current playing media in seconds."""
-#        return self._media_duration
-        return None
+        if self._media_duration is None :
+            return None
+        return int(self._media_duration)
 
     @property
     def current_position(self) -> int | None:
         """Position of current playing media in seconds."""
-#       return self._current_position
-        return None
+        if self._current_position is None :
+            return None
+        return int(self._current_position)
 
     @property
     def position_updated_at(self) -> datetime.datetime | None:
         """When was the position of the current playing media valid."""
-#        return self._position_updated_at
-        return None
+        return self._position_updated_at
 
     @property
     def preset_list(self) -> list | None:
         """Return the possible presets."""
-        try:
-            if self._presets is None or len(self._preset_list) > 0:
-                return sorted(self._preset_list)
-
-            for pre in self._presets :
-                self._preset_list.append(pre)
-
-            return sorted(self._preset_list)
-
-        except (KeyError, TypeError):
-            return None
+        return self._preset_list
 
     @property
     def preset(self) -> str | None:
@@ -469,70 +1304,157 @@ class DutchDutchApi:
             "masterUrl": self._masterurl,
             "sources": self._sources,
             "source list": self._source_list,
+            "sources version": self._sources_version,
             "streaming": self._streaming,
             "volume": self._volume,
             "preset": self._preset,
+            "presets": self._preset_ids,
+            "presets version": self._presets_version,
             "master addresses": self._masteraddresses,
-            "network_info": self._network_info
+            "room_info": self._room_info,
+            "recent_frames": (
+                [{"time": datetime.datetime.fromtimestamp(received,
+                                                          datetime.timezone.utc)
+                  .isoformat(),
+                  "frame": frame}
+                 for received, frame in self._frame_history]
+                if self._frame_history is not None else None
+            ),
+            "statistics": self._stats.as_dict() if self._stats is not None else None,
         }
 
+    def set_frame_history(self, size: int) -> None:
+        """Keep the last size raw frames from the device, for diagnostics.
+
+        A size of 0 turns this off.
+        """
+        if size <= 0 :
+            self._frame_history = None
+        else:
+            history = self._frame_history or ()
+            self._frame_history = collections.deque(history, maxlen = size)
+
+    def set_max_command_rate(self, rate: float) -> None:
+        """Set how many gain, mute or preset commands a second may be sent."""
+        self._command_interval = 1 / rate if rate > 0 else 0
+
+    async def ws_send_coalesced(self, endpoint, datadict, method = 'update',
+                                fields = ()) -> None:
+        """Send a command to the room, limiting how often each endpoint is sent.
+
+        If one went out too recently, only the latest value is kept, and that
+        is sent when the interval is up. A slider drag doesn't flood the device.
+        """
+
+        loop = asyncio.get_running_loop()
+        wait = self._lastsent.get(endpoint, 0) + self._command_interval - loop.time()
+        if wait <= 0 and endpoint not in self._coalesced :
+            self._lastsent[endpoint] = loop.time()
+            await self.ws_send_room(endpoint, datadict, method, fields)
+            return
+
+        self._coalesced[endpoint] = (datadict, method, fields)
+        if endpoint not in self._flushtasks :
+            self._flushtasks[endpoint] = loop.create_task(
+                self.async_flush_coalesced(endpoint, max(wait, 0)))
+
+    def is_coalescing(self, field) -> bool:
+        """Return true if a command changing a room field is being held back."""
+        return any(field in fields for _, _, fields in self._coalesced.values())
+
+    async def async_flush_coalesced(self, endpoint, delay) -> None:
+        """Send the latest value held back by ws_send_coalesced.
+
+        A value may arrive while the last one is being sent, so this carries
+        on until there are none left, still no faster than the interval.
+        """
+
+        try:
+            await asyncio.sleep(delay)
+            while (pending := self._coalesced.pop(endpoint, None)) is not None :
+                self._lastsent[endpoint] = asyncio.get_running_loop().time()
+                await self.ws_send_room(endpoint, *pending)
+                if endpoint in self._coalesced :
+                    await asyncio.sleep(self._command_interval)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._flushtasks.pop(endpoint, None)
+
+    async def ws_send_room(self, endpoint, datadict, method = 'update',
+                           fields = ()) -> None:
+        """Send a command to the room, tracking any optimistic fields it changed."""
+
+        mycmd = self.buildcmd(endpoint, datadict,
+                              method = method,
+                              targettype = 'room',
+                              target = self._roomtarget)
+        self.track_command(mycmd[1], fields)
+        await self.ws_send_request(mycmd[0])
+
+    def room_field(self, field) -> dict:
+        """Return a copy of a dict-valued room field, to base a change on."""
+        try:
+            return dict(self._roomdata[field])
+        except (KeyError, TypeError, ValueError):
+            return {}
+
+    @staticmethod
+    def gain_for_volume(volume: float) -> float:
+        """Convert a volume level, range 0..1, to the device's -80..0 gain."""
+        gain = (80 * volume) - 80
+        return min(gain, MAXGAIN)
+
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level, range 0..1. converted to -80..0 ."""
         if not self._extgain :
-            gain = (80 * volume) - 80
-            gain = min(gain, MAXGAIN)
-            myreq = self.buildcmd('gain2', {'gain': gain},
-                              targettype = 'room',
-                              target = self._roomtarget)
-            await self.ws_send_request(myreq[0])
+            gain = self.gain_for_volume(volume)
+            fields = await self.async_apply_optimistic(
+                'gain', {**self.room_field('gain'), 'global': gain})
+            await self.ws_send_coalesced('gain2', {'gain': gain}, fields = fields)
 
     async def async_mute_volume(self, mute: bool) -> None:
         """Mute (true) or unmute (false) media player."""
-        myreq = self.buildcmd('mute',
-                              [{'mute': mute, 'positionID': 'global'}],
-                              targettype = 'room',
-                              target = self._roomtarget)
-        await self.ws_send_request(myreq[0])
+        fields = await self.async_apply_optimistic(
+            'mute', {**self.room_field('mute'), 'global': mute})
+        await self.ws_send_coalesced('mute',
+                                     [{'mute': mute, 'positionID': 'global'}],
+                                     fields = fields)
+
+    async def async_set_playing(self, playing: bool) -> tuple:
+        """Show the play state changing, if there's something streaming."""
+        if not self._streaming or not self.room_field('streamingInfo') :
+            return ()
+        return await self.async_apply_optimistic(
+            'streamingInfo', {**self.room_field('streamingInfo'), 'is_playing': playing})
 
     async def async_media_play(self) -> None:
         """Play media player."""
-        await self.ws_send_request(
-            self.buildcmd('streaming-api',
-                          {'method': 'Play', 'arguments': []},
-                          targettype = 'room',
-                          target = self._roomtarget)[0])
+        await self.ws_send_room('streaming-api',
+                                {'method': 'Play', 'arguments': []},
+                                fields = await self.async_set_playing(True))
 
     async def async_media_pause(self) -> None:
         """Pause media player."""
-        await self.ws_send_request(
-            self.buildcmd('streaming-api',
-                          {'method': 'Pause', 'arguments': []},
-                          targettype = 'room',
-                          target = self._roomtarget)[0])
+        await self.ws_send_room('streaming-api',
+                                {'method': 'Pause', 'arguments': []},
+                                fields = await self.async_set_playing(False))
 
     async def async_media_stop(self) -> None:
         """Pause media player."""
-        await self.ws_send_request(
-            self.buildcmd('streaming-api',
-                          {'method': 'Pause', 'arguments': []},
-                          targettype = 'room',
-                          target = self._roomtarget)[0])
+        await self.ws_send_room('streaming-api',
+                                {'method': 'Pause', 'arguments': []},
+                                fields = await self.async_set_playing(False))
 
     async def async_media_next_track(self) -> None:
         """Send the next track command."""
-        await self.ws_send_request(
-            self.buildcmd('streaming-api',
-                          {'method': 'Next', 'arguments': []},
-                          targettype = 'room',
-                          target = self._roomtarget)[0])
+        await self.ws_send_room('streaming-api',
+                                {'method': 'Next', 'arguments': []})
 
     async def async_media_previous_track(self) -> None:
         """Send the previous track command."""
-        await self.ws_send_request(
-            self.buildcmd('streaming-api',
-                          {'method': 'Previous', 'arguments': []},
-                          targettype = 'room',
-                          target = self._roomtarget)[0])
+        await self.ws_send_room('streaming-api',
+                                {'method': 'Previous', 'arguments': []})
 
     async def async_select_source(self, source: str) -> None:
         """Select input source."""
@@ -541,10 +1463,8 @@ class DutchDutchApi:
             name = "XLR"
         else :
             name = source
-        await self.ws_send_request(
-            self.buildcmd('selectedInput', {'input': name},
-                          targettype = 'room',
-                          target = self._roomtarget)[0])
+        fields = await self.async_apply_optimistic('selectedInput', name)
+        await self.ws_send_room('selectedInput', {'input': name}, fields = fields)
 
     async def async_set_preset(self, presetname: str) -> None:
         """Set the voicing and correction preset."""
@@ -555,26 +1475,87 @@ class DutchDutchApi:
             LOGGER.error("Unknown preset %s selected", presetname)
             return
 
-        await self.ws_send_request(
-            self.buildcmd('preset2',
-                          {'presetID': presetid},
-                          method = 'select',
-                          targettype = 'room',
-                          target = self._roomtarget)[0])
+        fields = await self.async_apply_optimistic('lastSelectedPreset', presetid)
+        await self.ws_send_coalesced('preset2',
+                                     {'presetID': presetid},
+                                     method = 'select',
+                                     fields = fields)
 
     async def async_turn_off(self) -> None:
         """Turn off media player."""
-        await self.ws_send_request(
-            self.buildcmd('sleep', {'enable': True},
-                          targettype = 'room',
-                          target = self._roomtarget)[0])
+        fields = await self.async_apply_optimistic('sleep', True)
+        await self.ws_send_room('sleep', {'enable': True}, fields = fields)
 
     async def async_turn_on(self) -> None:
         """Turn on media player."""
-        await self.ws_send_request(
-            self.buildcmd('sleep', {'enable': False},
-                          targettype = 'room',
-                          target = self._roomtarget)[0])
+        fields = await self.async_apply_optimistic('sleep', False)
+        await self.ws_send_room('sleep', {'enable': False}, fields = fields)
+
+    async def async_batch(self, source = None, preset = None, volume = None,
+                          mute = None, timeout = None) -> bool:
+        """Change several room settings together.
+
+        The commands are all written in one go and the responses waited for
+        together, so a scene doesn't pay for a round trip per setting.
+        Returns true if the device answered every command in time.
+        """
+
+        # endpoint, data, method, then the room field it changes and how
+        changes = []
+        if source is not None :
+            name = source if source in VALID_STREAMERS else "XLR"
+            changes.append(('selectedInput', {'input': name}, 'update',
+                            'selectedInput', name))
+        if preset is not None :
+            if preset in self._presets :
+                presetid = self._presets[preset]
+                changes.append(('preset2', {'presetID': presetid}, 'select',
+                                'lastSelectedPreset', presetid))
+            else :
+                LOGGER.error("Unknown preset %s selected", preset)
+        if volume is not None and not self._extgain :
+            gain = self.gain_for_volume(volume)
+            changes.append(('gain2', {'gain': gain}, 'update',
+                            'gain', {**self.room_field('gain'), 'global': gain}))
+        if mute is not None :
+            changes.append(('mute', [{'mute': mute, 'positionID': 'global'}], 'update',
+                            'mute', {**self.room_field('mute'), 'global': mute}))
+        if not changes :
+            return True
+
+        loop = asyncio.get_running_loop()
+        frames = []
+        futures = {}
+        for endpoint, datadict, method, field, value in changes:
+            # this supersedes anything the rate limiter is holding back
+            self._coalesced.pop(endpoint, None)
+            self._lastsent[endpoint] = loop.time()
+            fields = await self.async_apply_optimistic(field, value)
+            mycmd = self.buildcmd(endpoint, datadict,
+                                  method = method,
+                                  targettype = 'room',
+                                  target = self._roomtarget)
+            futures[mycmd[1]] = self.track_command(mycmd[1], fields, always = True)
+            frames.append(mycmd[0])
+
+        for frame in frames:
+            if not await self.ws_send_request(frame) :
+                return False
+
+        if timeout is None :
+            timeout = self._request_timeout
+        _, notdone = await asyncio.wait(futures.values(), timeout = timeout)
+        for myuuid, future in futures.items():
+            # optimistic changes are left to expire_optimistic to tidy up
+            if not future.done() and myuuid not in self._tracked :
+                self._pending.pop(myuuid, None)
+                future.cancel()
+        if notdone :
+            LOGGER.debug("Host %s: %d of %d batched commands unanswered",
+                         self._host, len(notdone), len(futures))
+            return False
+        return all(not future.cancelled() and future.result() is not None
+                   for future in futures.values())
 
     async def ws_connect(self) -> bool :
         """Try to connect to the target with a websession."""
@@ -585,11 +1566,18 @@ class DutchDutchApi:
                 connurl = self._masterurl
             else :
                 connurl = 'ws://'+self._host+':8768'
-            self._ws_session = await self._session.ws_connect(
-                url=connurl,
-                compress=0,
-                heartbeat=30)
+            self._ws_session = await asyncio.wait_for(
+                self._session.ws_connect(
+                    url=connurl,
+                    compress=0,
+                    heartbeat=30),
+                self._connect_timeout)
+            self._connurl = connurl
             LOGGER.debug("WS connected")
+            # a single reader task owns the socket from here on
+            self._pending = {}
+            self._task = asyncio.get_running_loop().create_task(
+                self.async_ws_listener())
             return True
 
         except aiohttp.ClientError as conn_err:
@@ -601,6 +1589,11 @@ class DutchDutchApi:
                 pass
             self._ws_session = None
             return False
+        except asyncio.TimeoutError:
+            LOGGER.debug("Host %s: ws_connect timed out", self._host)
+            self._timed_out = True
+            self._ws_session = None
+            return False
         except Exception as whaterror:  # pylint: disable=bare-except
             LOGGER.debug("ws_connect unexpected exception occurred %s",
                          type(whaterror).__name__)
@@ -612,20 +1605,42 @@ class DutchDutchApi:
             return False
 
 
+    async def ws_close(self) -> None:
+        """Stop the reader task and close the websocket."""
+
+        task = self._task
+        self._task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._ws_session is not None:
+            try:
+                await self._ws_session.close()
+            except: # pylint: disable=bare-except
+                pass
+        self._ws_session = None
+        self.fail_pending()
+
     async def get_request(self, suffix=str) -> any | None:
         """Get data using HTTP GET."""
 
         url = "http://" + self._host + str(suffix)
         try:
             async with self._session.get(
-                url=url, allow_redirects=True, timeout=2
+                url=url,
+                allow_redirects=True,
+                timeout=aiohttp.ClientTimeout(total=self._http_timeout),
             ) as response:
                 myresponse = await response.text()
-                LOGGER.debug(
-                    "Host %s: HTTP Response data: %s",
-                    self._host,
-                    myresponse,
-                )
+                if LOGGER.isEnabledFor(logging.DEBUG) :
+                    LOGGER.debug(
+                        "Host %s: HTTP Response data: %s",
+                        self._host,
+                        myresponse[:TRACE_LENGTH],
+                    )
 
             return myresponse
 
@@ -637,6 +1652,7 @@ class DutchDutchApi:
             LOGGER.debug(
                 "GET connection timeout exception"
             )
+            self._timed_out = True
             return None
         except (TypeError, json.JSONDecodeError):
             LOGGER.debug("JSON/Type error in GET")
@@ -649,12 +1665,13 @@ class DutchDutchApi:
         """Websocket Send method."""
 
         try:
-            LOGGER.debug(
-                    "Host %s: WS send: %s",
-                    self._host,
-                    wstring[0:120],
-                )
+            if self._wire_trace or LOGGER.isEnabledFor(logging.DEBUG) :
+                self.trace_frame("tx", wstring)
             await self._ws_session.send_str (wstring, compress=None)
+            if self._recorder is not None :
+                self._recorder("tx", wstring)
+            if self._stats is not None :
+                self._stats.frames_sent += 1
 
             return True
 
@@ -679,26 +1696,45 @@ class DutchDutchApi:
             return False
 
 
-    async def ws_receive (self, myuuid=str) -> dict | None:
-        """Websocket receive method.
+    async def ws_request(self, mycmd, timeout = None) -> dict | None:
+        """Send a command built by buildcmd and wait for its response.
 
-        If uuid is specified,wait until that one arrives, throwing everything else away.
+        The response is delivered by the listener task, so several requests
+        can be outstanding at once without losing notifications. If it
+        doesn't come in time, or the caller is cancelled, the request is
+        forgotten but the connection is left alone.
         """
 
+        if timeout is None :
+            timeout = self._request_timeout
+        myuuid = mycmd[1]
+        future = asyncio.get_running_loop().create_future()
+        self._pending[myuuid] = future
+        try:
+            if not await self.ws_send_request(mycmd[0]) :
+                return None
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            LOGGER.debug("Host %s: no response to request %s", self._host, myuuid)
+            self._timed_out = True
+            if self._stats is not None :
+                self._stats.timeouts += 1
+            return None
+        finally:
+            self._pending.pop(myuuid, None)
+
+    async def ws_receive (self) -> str | None:
+        """Websocket receive method, returns the next frame from the device undecoded."""
+
         try:
             while True :
                 myresponse = await self._ws_session.receive_str()
                 if myresponse is not None :
-                    LOGGER.debug(
-                        "Host %s: WS response: %s",
-                        self._host,
-                        myresponse[0:120],
-                    )
-                    respjson = json.loads(myresponse)
-                    if myuuid is None or respjson['meta']['id'] == myuuid :
-                        break
-
-            return respjson
+                    if self._recorder is not None :
+                        self._recorder("rx", myresponse)
+                    if self._wire_trace or LOGGER.isEnabledFor(logging.DEBUG) :
+                        self.trace_frame("rx", myresponse)
+                    return myresponse
 
         except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as conn_err:
             LOGGER.debug("Host %s: ws_receive Connection error %s", self._host, str(conn_err))
@@ -15,3 +15,37 @@ INPUT_TO_SOURCE = {
 
 # The HA volume sliders are easy to set full scale by mistake, so for safety:
 MAXGAIN = -10
+
+# Gain, mute and preset commands sent per second at most, later values
+# in between are held back and only the latest one is sent
+DEFAULT_MAX_COMMAND_RATE = 5
+
+# How long to wait, in seconds, for the HTTP check that a host is a speaker,
+# for a websocket connection to open, and for the response to a request
+HTTP_TIMEOUT = 2
+CONNECT_TIMEOUT = 5
+REQUEST_TIMEOUT = 10
+
+# Reconnection backoff after a live connection drops, in seconds. Each retry
+# waits a random time up to the current limit, which doubles up to the cap.
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+
+# Commands change the state shown straight away. If the device hasn't
+# confirmed the change within this many seconds, it's rolled back. Once it
+# has acknowledged a command, the matching notification is only waited for
+# a short while.
+OPTIMISTIC_TIMEOUT = 5
+OPTIMISTIC_ACK_GRACE = 1
+# While a slider is dragged the device echoes the values we sent along the
+# way. This many of the latest are recognised as ours.
+OPTIMISTIC_SENT_HISTORY = 16
+
+# Raw frames from the device can be kept for diagnostics, off by default.
+# Each one is cut short at this many characters.
+DEFAULT_FRAME_HISTORY = 0
+MAX_FRAME_HISTORY_LENGTH = 4096
+
+# Frames logged at debug level are cut short at this many characters. A
+# wire trace logs them in full, at info level.
+TRACE_LENGTH = 120
@@ -0,0 +1,150 @@
+"""Counters and latency histograms for the Dutch & Dutch API."""
+
+from __future__ import annotations
+
+import bisect
+import time
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (
+    0.00001, 0.00002, 0.00005, 0.0001, 0.0002, 0.0005,
+    0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30, 60,
+)
+BUCKET_NAMES = (*(f"<={bound}" for bound in BUCKETS), f">{BUCKETS[-1]}")
+
+# Commands waiting for a response that are remembered, the oldest are
+# forgotten first
+MAX_INFLIGHT = 256
+
+
+class Histogram:
+    """Count how many times fell into each of a fixed set of buckets."""
+
+    __slots__ = ("counts", "count", "total", "maximum")
+
+    def __init__(self) -> None:
+        """Start empty."""
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Count a time."""
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the bucket bound that a fraction of the times fall within."""
+        if not self.count:
+            return None
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= wanted:
+                return min(bound, self.maximum)
+        return self.maximum
+
+    def as_dict(self) -> dict:
+        """Return the histogram in a form that can be shown in diagnostics."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "max": self.maximum,
+            "buckets": {
+                name: count
+                for name, count in zip(BUCKET_NAMES, self.counts)
+                if count
+            },
+        }
+
+
+class DutchDutchStats:
+    """What the API has been doing, for diagnostics and sensors.
+
+    The API only keeps one of these while statistics are turned on, and
+    checks for it before each call, so they cost nothing otherwise.
+    """
+
+    def __init__(self) -> None:
+        """Start with nothing counted."""
+        self.frames_received = 0
+        self.frames_sent = 0
+        self.frames_discarded = 0
+        self.notifications = 0
+        self.updates = 0
+        self.connection_losses = 0
+        self.reconnects = 0
+        self.timeouts = 0
+        # endpoint -> time from sending a request to its response
+        self.latency: dict[str, Histogram] = {}
+        self.notify_interval = Histogram()
+        # time taken to derive the room state from each frame
+        self.update_time = Histogram()
+        self._inflight: dict[str, tuple[str, float]] = {}
+        self._last_notify: float | None = None
+
+    def request(self, myuuid: str, endpoint: str) -> None:
+        """Note when a request was made, to time its response."""
+        if len(self._inflight) >= MAX_INFLIGHT:
+            del self._inflight[next(iter(self._inflight))]
+        self._inflight[myuuid] = (endpoint, time.monotonic())
+
+    def received(self, myuuid: str | None) -> None:
+        """Time the response to a request, if it's one we sent."""
+        if (inflight := self._inflight.pop(myuuid, None)) is None:
+            return
+        endpoint, sent = inflight
+        if (histogram := self.latency.get(endpoint)) is None:
+            histogram = self.latency[endpoint] = Histogram()
+        histogram.add(time.monotonic() - sent)
+
+    def notified(self, changed: bool) -> None:
+        """Count a network notification, and the time since the last one."""
+        now = time.monotonic()
+        if self._last_notify is not None:
+            self.notify_interval.add(now - self._last_notify)
+        self._last_notify = now
+        self.notifications += 1
+        if changed:
+            self.updates += 1
+
+    def lost_connection(self) -> None:
+        """Count a connection loss, forgetting the requests that were in flight."""
+        self.connection_losses += 1
+        self._inflight.clear()
+        self._last_notify = None
+
+    @property
+    def command_latency(self) -> float | None:
+        """Return the median response time over every endpoint, in seconds."""
+        overall = Histogram()
+        for histogram in self.latency.values():
+            overall.counts = [a + b for a, b in zip(overall.counts, histogram.counts)]
+            overall.count += histogram.count
+            overall.maximum = max(overall.maximum, histogram.maximum)
+        return overall.percentile(0.5)
+
+    def as_dict(self) -> dict:
+        """Return everything counted, in a form that can be shown in diagnostics."""
+        return {
+            "frames received": self.frames_received,
+            "frames sent": self.frames_sent,
+            "frames discarded": self.frames_discarded,
+            "notifications": self.notifications,
+            "updates": self.updates,
+            "connection losses": self.connection_losses,
+            "reconnects": self.reconnects,
+            "timeouts": self.timeouts,
+            "latency": {
+                endpoint: histogram.as_dict()
+                for endpoint, histogram in sorted(self.latency.items())
+            },
+            "notify interval": self.notify_interval.as_dict(),
+            "update time": self.update_time.as_dict(),
+        }
@@ -0,0 +1,276 @@
+"""Shared registry of Dutch & Dutch speaker pairs."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .art import AlbumArtCache
+from .const import DATA_HUB, GROUP_COMMAND_GRACE, MAX_PARALLEL_CONNECTS
+from .dutchdutch_api import DutchDutchApi
+
+_LOGGER = logging.getLogger(__name__)
+
+# How long a host found by validation is remembered as belonging to a pair
+VALIDATION_CACHE_TIME = 600
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> DutchDutchHub:
+    """Return the hub, creating it the first time."""
+    if (hub := hass.data.get(DATA_HUB)) is None:
+        hub = hass.data[DATA_HUB] = DutchDutchHub(hass)
+    return hub
+
+
+class DutchDutchHub:
+    """Know which hosts belong to which speaker pair.
+
+    Both the config flow and the running entries go through here, so a
+    host that is already connected is answered without any network traffic,
+    and the two speakers of a pair discovered together only get checked once
+    if zeroconf tells us enough to match the second to the first.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self._hass = hass
+        self._clients: list[DutchDutchApi] = []
+        # host or address -> serial of its pair, and when to forget it
+        self._hosts: dict[str, tuple[str, float]] = {}
+        # serial, room or device target of a pair -> its serial, and when to forget it
+        self._identifiers: dict[str, tuple[str, float]] = {}
+        # host being checked -> its result, and the identifiers it was found with
+        self._validations: dict[
+            str, tuple[asyncio.Future[str | None], frozenset[str]]
+        ] = {}
+        # media player entity id -> its client, and how to tell it the group changed
+        self._players: dict[str, tuple[DutchDutchApi, Callable[[], None]]] = {}
+        # group leader entity id -> the other members
+        self._groups: dict[str, list[str]] = {}
+        # shared by all entries, so startup with many pairs doesn't swamp the network
+        self.connect_limit = asyncio.Semaphore(MAX_PARALLEL_CONNECTS)
+        self.art_cache = AlbumArtCache(hass)
+
+    @callback
+    def async_add_client(self, client: DutchDutchApi) -> None:
+        """Register the client of a running config entry."""
+        self._clients.append(client)
+
+    @callback
+    def async_remove_client(self, client: DutchDutchApi) -> None:
+        """Forget the client of a config entry being unloaded."""
+        if client in self._clients:
+            self._clients.remove(client)
+
+    @callback
+    def async_add_player(
+        self, entity_id: str, client: DutchDutchApi, update: Callable[[], None]
+    ) -> None:
+        """Register a media player entity so it can be grouped."""
+        self._players[entity_id] = (client, update)
+
+    @callback
+    def async_remove_player(self, entity_id: str) -> None:
+        """Forget a media player entity being removed."""
+        self.async_unjoin(entity_id)
+        self._players.pop(entity_id, None)
+
+    @callback
+    def async_join(self, leader: str, members: list[str]) -> None:
+        """Make a group led by one player, taking the members out of any other."""
+        members = [
+            member
+            for member in dict.fromkeys(members)
+            if member != leader and member in self._players
+        ]
+        for entity_id in (leader, *members):
+            self._async_leave(entity_id)
+        if members:
+            self._groups[leader] = members
+        self._async_group_changed(leader, *members)
+
+    @callback
+    def async_unjoin(self, entity_id: str) -> None:
+        """Take a player out of its group, breaking it up if it was the leader."""
+        if (group := self.group_members(entity_id)) is None:
+            return
+        self._async_leave(entity_id)
+        self._async_group_changed(*group)
+
+    @callback
+    def _async_leave(self, entity_id: str) -> None:
+        """Remove a player from the group data, without telling anyone."""
+        self._groups.pop(entity_id, None)
+        for leader, members in list(self._groups.items()):
+            if entity_id in members:
+                members.remove(entity_id)
+                if not members:
+                    del self._groups[leader]
+
+    @callback
+    def _async_group_changed(self, *entity_ids: str) -> None:
+        """Let players know their group membership has changed."""
+        for entity_id in entity_ids:
+            if (player := self._players.get(entity_id)) is not None:
+                player[1]()
+
+    @callback
+    def group_members(self, entity_id: str) -> list[str] | None:
+        """Return the group a player is in, leader first, or None."""
+        for leader, members in self._groups.items():
+            if entity_id == leader or entity_id in members:
+                return [leader, *members]
+        return None
+
+    async def async_call_group(
+        self,
+        entity_id: str,
+        call: Callable[[DutchDutchApi], Awaitable[object]],
+    ) -> None:
+        """Run a command on the client of a player and everything grouped with it.
+
+        The pairs are all sent to at once, and any that haven't finished
+        within the timeout are given up on, so one slow pair can't hold up
+        the rest. If any pair failed or was given up on, HomeAssistantError
+        is raised naming them, once the others have finished.
+        """
+        entity_ids = self.group_members(entity_id) or [entity_id]
+        members = [
+            (member, self._players[member][0])
+            for member in entity_ids
+            if member in self._players
+        ]
+        if not members:
+            return
+
+        timeout = (
+            max(client.request_timeout for _, client in members) + GROUP_COMMAND_GRACE
+        )
+        tasks = [asyncio.ensure_future(call(client)) for _, client in members]
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+        failed = []
+        for (member, _), task in zip(members, tasks):
+            if task in pending or task.cancelled():
+                _LOGGER.warning("%s did not respond in time", member)
+                failed.append(member)
+            elif (err := task.exception()) is not None:
+                _LOGGER.error("Command to %s failed: %s", member, err)
+                failed.append(member)
+        if failed:
+            raise HomeAssistantError(f"Command failed for {', '.join(failed)}")
+
+    @callback
+    def serial_for_host(self, host: str) -> str | None:
+        """Return the serial of the pair a host is known to belong to."""
+        for client in self._clients:
+            if client.serial and (
+                client.host == host or host in client.master_addresses
+            ):
+                return client.serial
+
+        return self._known(self._hosts, host)
+
+    @callback
+    def serial_for_identifiers(self, identifiers: Iterable[str]) -> str | None:
+        """Return the serial of the pair that any of some identifiers belong to.
+
+        The identifiers are compared with the serials and the room and device
+        targets of the pairs we know about, so a speaker announced by zeroconf
+        can be recognised from what was learned talking to its partner.
+        """
+        identifiers = {identifier.lower() for identifier in identifiers}
+        if not identifiers:
+            return None
+        for client in self._clients:
+            if client.serial and not identifiers.isdisjoint(
+                target.lower() for target in (client.serial, *client.pair_targets)
+            ):
+                return client.serial
+        for identifier in identifiers:
+            if (serial := self._known(self._identifiers, identifier)) is not None:
+                return serial
+        return None
+
+    @callback
+    def _known(self, table: dict[str, tuple[str, float]], key: str) -> str | None:
+        """Look up a serial learned by validation, if it hasn't expired."""
+        if (known := table.get(key)) is not None:
+            serial, expires = known
+            if time.monotonic() < expires:
+                return serial
+            del table[key]
+        return None
+
+    @callback
+    def async_remember_hosts(self, serial: str, *hosts: str) -> None:
+        """Note that some hosts or addresses belong to a pair."""
+        expires = time.monotonic() + VALIDATION_CACHE_TIME
+        for host in hosts:
+            self._hosts[host] = (serial, expires)
+
+    async def async_validate(
+        self, host: str, identifiers: Iterable[str] = ()
+    ) -> str | None:
+        """Check a host is a Dutch & Dutch speaker, and return the pair's serial.
+
+        Identifiers are anything distinctive that the host was announced
+        with. If they match a pair already known, no connection is made.
+        """
+
+        identifiers = frozenset(identifier.lower() for identifier in identifiers)
+        while True:
+            serial = self.serial_for_host(host) or self.serial_for_identifiers(
+                identifiers
+            )
+            if serial is not None:
+                return serial
+            if (pending := self._validations.get(host)) is not None:
+                return await asyncio.shield(pending[0])
+            # The other speaker of the same pair may be being checked right
+            # now, and once it is done we may already know about this one.
+            # Only checks announced with something in common can be it.
+            related = [
+                future
+                for future, others in self._validations.values()
+                if not identifiers.isdisjoint(others)
+            ]
+            if not related:
+                break
+            await asyncio.wait(related)
+
+        future = self._hass.loop.create_future()
+        self._validations[host] = (future, identifiers)
+        serial = None
+        try:
+            serial = await self._async_validate(host)
+            return serial
+        finally:
+            del self._validations[host]
+            future.set_result(serial)
+
+    async def _async_validate(self, host: str) -> str | None:
+        """Connect to a host to find out which pair it belongs to."""
+
+        client = DutchDutchApi(host, async_get_clientsession(self._hass), None)
+        async with self.connect_limit:
+            if (
+                not await client.async_check_valid(read_targets=True)
+                or not client.serial
+            ):
+                return None
+
+        self.async_remember_hosts(client.serial, host, *client.master_addresses)
+        expires = time.monotonic() + VALIDATION_CACHE_TIME
+        for identifier in (client.serial, *client.pair_targets):
+            self._identifiers[identifier.lower()] = (client.serial, expires)
+        return client.serial
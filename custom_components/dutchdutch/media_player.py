@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
+import voluptuous as vol
+
 from homeassistant.components.media_player import (
+    ATTR_INPUT_SOURCE,
+    ATTR_MEDIA_VOLUME_LEVEL,
+    ATTR_MEDIA_VOLUME_MUTED,
+    ATTR_SOUND_MODE,
     MediaPlayerEntity,
     MediaPlayerEntityFeature,
     MediaPlayerState,
@@ -11,12 +17,23 @@ from homeassistant.components.media_player import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MANUFACTURER
+from .const import (
+    ATTR_ENABLED,
+    ATTR_SAMPLE,
+    DOMAIN,
+    MANUFACTURER,
+    SERVICE_SET_STATE,
+    SERVICE_WIRE_TRACE,
+)
 from .coordinator import DutchDutchCoordinator
+from .dutchdutch_api import DutchDutchApi
+from .hub import async_get_hub
 
 SUPPORT_DUTCHDUTCH = (
     MediaPlayerEntityFeature.VOLUME_SET
@@ -25,6 +42,7 @@ SUPPORT_DUTCHDUTCH = (
     | MediaPlayerEntityFeature.TURN_ON
     | MediaPlayerEntityFeature.SELECT_SOURCE
     | MediaPlayerEntityFeature.SELECT_SOUND_MODE
+    | MediaPlayerEntityFeature.GROUPING
 )
 
 DUTCHDUTCH_TO_HA_FEATURE_MAP = {
@@ -40,10 +58,39 @@ async def async_setup_entry(
 ) -> None:
     """Set up the Dutch & Dutchentry."""
     client = hass.data[DOMAIN][entry.entry_id]
-    coordinator = DutchDutchCoordinator(hass, client)
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = DutchDutchCoordinator(hass, client, entry)
+    entry.async_on_unload(coordinator.async_shutdown)
 
+    # Don't hold up startup waiting for the speakers, the entity shows as
+    # unavailable until the first connection is made in the background.
     async_add_entities([DutchDutchMediaPlayerEntity(coordinator, entry)])
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), f"{DOMAIN} {entry.title} first refresh"
+    )
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_SET_STATE,
+        {
+            vol.Optional(ATTR_INPUT_SOURCE): cv.string,
+            vol.Optional(ATTR_SOUND_MODE): cv.string,
+            vol.Optional(ATTR_MEDIA_VOLUME_LEVEL): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=1)
+            ),
+            vol.Optional(ATTR_MEDIA_VOLUME_MUTED): cv.boolean,
+        },
+        "async_set_state",
+    )
+    platform.async_register_entity_service(
+        SERVICE_WIRE_TRACE,
+        {
+            vol.Required(ATTR_ENABLED): cv.boolean,
+            vol.Optional(ATTR_SAMPLE, default=1): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=1000)
+            ),
+        },
+        "async_wire_trace",
+    )
 
 
 class DutchDutchMediaPlayerEntity(
@@ -55,6 +102,7 @@ class DutchDutchMediaPlayerEntity(
     _attr_name = None
     _confname = None
     _connected_once = False
+    _last_written = None
 
     def __init__(self, coordinator: DutchDutchCoordinator, entry: ConfigEntry) -> None:
         """Initialize the Dutch & Dutch device."""
@@ -65,6 +113,18 @@ class DutchDutchMediaPlayerEntity(
         self._attr_unique_id = str(entry.unique_id)
         self._update_device_info()
 
+    async def async_added_to_hass(self) -> None:
+        """Make the player available for grouping."""
+        await super().async_added_to_hass()
+        async_get_hub(self.hass).async_add_player(
+            self.entity_id, self.coordinator.client, self._async_write_if_changed
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Take the player out of any group."""
+        async_get_hub(self.hass).async_remove_player(self.entity_id)
+        await super().async_will_remove_from_hass()
+
     def _update_device_info(self) -> None:
         """Update device info."""
         # HA throws an exception if the URL isn't valid, so make sure it's present
@@ -90,7 +150,7 @@ class DutchDutchMediaPlayerEntity(
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         if not self.coordinator.client.is_available:
-            self.async_write_ha_state()
+            self._async_write_if_changed()
             return
 
         if self._connected_once is False:
@@ -98,36 +158,46 @@ class DutchDutchMediaPlayerEntity(
             self._update_device_info()
             self._connected_once = True
 
-        self._attr_volume_level = self.coordinator.client.volume_level
-        self._attr_is_volume_muted = self.coordinator.client.is_volume_muted
-        self._attr_source_list = self.coordinator.client.source_list
-        self._attr_sound_mode_list = self.coordinator.client.preset_list
-        self._attr_media_artist = self.coordinator.client.media_artist
-        self._attr_media_album_name = self.coordinator.client.media_album_name
-        self._attr_media_artist = self.coordinator.client.media_artist
-        self._attr_media_image_url = self.coordinator.client.media_image_url
-        self._attr_media_duration = self.coordinator.client.media_duration
-        self._attr_media_position = self.coordinator.client.current_position
-        self._attr_media_position_updated_at = (
-            self.coordinator.client.position_updated_at
+        room = self.coordinator.client.snapshot
+        self._attr_volume_level = room.volume_level
+        self._attr_is_volume_muted = room.is_volume_muted
+        self._attr_source_list = (
+            list(room.source_list) if room.source_list is not None else None
         )
-        self._attr_media_title = (
-            self.coordinator.client.media_title
-            if self.coordinator.client.media_title
-            else self.source
+        self._attr_sound_mode_list = (
+            list(room.preset_list) if room.preset_list is not None else None
         )
-        self._attr_media_content_type = (
-            MediaType.MUSIC
-            if self.coordinator.client.streaming
-            else None
+        self._attr_media_artist = room.media_artist
+        self._attr_media_album_name = room.media_album_name
+        self._attr_media_image_url = room.media_image_url
+        self._attr_media_duration = room.media_duration
+        self._attr_media_position = room.current_position
+        self._attr_media_position_updated_at = room.position_updated_at
+        self._attr_media_title = room.media_title if room.media_title else room.source
+        self._attr_media_content_type = MediaType.MUSIC if room.streaming else None
+        self._async_write_if_changed()
+
+    @callback
+    def _async_write_if_changed(self) -> None:
+        """Write the state, unless it is identical to the last one written."""
+        # everything shown comes from the client's snapshot, so comparing
+        # that is enough
+        snapshot = (
+            self.available,
+            self.coordinator.client.snapshot,
+            self.group_members,
         )
+        if snapshot == self._last_written:
+            return
+        self._last_written = snapshot
         self.async_write_ha_state()
 
     @property
     def state(self) -> MediaPlayerState | None:
         """Return the state of the device."""
-        playing_state = self.coordinator.client.playing_state
-        power_state = self.coordinator.client.power_state
+        room = self.coordinator.client.snapshot
+        playing_state = room.playing_state
+        power_state = room.power_state
 
         if not power_state :
             return MediaPlayerState.OFF
@@ -146,28 +216,40 @@ class DutchDutchMediaPlayerEntity(
     def supported_features(self) -> MediaPlayerEntityFeature:
         """Flag media player features that are supported."""
         features = SUPPORT_DUTCHDUTCH
+        room = self.coordinator.client.snapshot
 
-        if not self.coordinator.client.streaming :
+        if not room.streaming :
             return features
 
-        if not self.coordinator.client.available_options:
+        if not room.available_options:
             return features
 
-        for option in self.coordinator.client.available_options:
+        for option in room.available_options:
             features |= DUTCHDUTCH_TO_HA_FEATURE_MAP.get(option, 0)
         return features
 
     @property
     def source(self) -> str | None:
         """Return the current input source."""
-        return self.coordinator.client.source
+        return self.coordinator.client.snapshot.source
 
     @property
     def sound_mode(self) -> str | None:
         """Return the current sound mode."""
-        if self.coordinator.client.preset is not None:
-            return self.coordinator.client.preset
-        return None
+        return self.coordinator.client.snapshot.preset
+
+    async def async_get_media_image(self) -> tuple[bytes | None, str | None]:
+        """Fetch the album art, through the shared cache."""
+        if (url := self.media_image_url) is None:
+            return None, None
+        return await async_get_hub(self.hass).art_cache.async_get(url)
+
+    @property
+    def group_members(self) -> list[str] | None:
+        """Return the players grouped with this one, leader first."""
+        if self.hass is None:
+            return None
+        return async_get_hub(self.hass).group_members(self.entity_id)
 
     @property
     def volume_step(self) -> float | None:
@@ -176,11 +258,15 @@ class DutchDutchMediaPlayerEntity(
 
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level, range 0..1."""
-        await self.coordinator.client.async_set_volume_level(volume)
+        await async_get_hub(self.hass).async_call_group(
+            self.entity_id, lambda client: client.async_set_volume_level(volume)
+        )
 
     async def async_mute_volume(self, mute: bool) -> None:
         """Mute (true) or unmute (false) media player."""
-        await self.coordinator.client.async_mute_volume(mute)
+        await async_get_hub(self.hass).async_call_group(
+            self.entity_id, lambda client: client.async_mute_volume(mute)
+        )
 
     async def async_media_play(self) -> None:
         """Play media player."""
@@ -204,16 +290,48 @@ class DutchDutchMediaPlayerEntity(
 
     async def async_select_sound_mode(self, sound_mode: str) -> None:
         """Send sound mode command."""
-        await self.coordinator.client.async_set_preset(sound_mode)
+        await async_get_hub(self.hass).async_call_group(
+            self.entity_id, lambda client: client.async_set_preset(sound_mode)
+        )
 
     async def async_turn_off(self) -> None:
         """Turn off media player."""
-        await self.coordinator.client.async_turn_off()
+        await async_get_hub(self.hass).async_call_group(
+            self.entity_id, lambda client: client.async_turn_off()
+        )
 
     async def async_turn_on(self) -> None:
         """Turn on media player."""
-        await self.coordinator.client.async_turn_on()
+        await async_get_hub(self.hass).async_call_group(
+            self.entity_id, lambda client: client.async_turn_on()
+        )
 
     async def async_select_source(self, source: str) -> None:
         """Select input source."""
         await self.coordinator.client.async_select_source(source)
+
+    async def async_set_state(self, **kwargs) -> None:
+        """Change source, sound mode, volume and mute together."""
+
+        async def set_state(client: DutchDutchApi) -> None:
+            if not await client.async_batch(
+                source=kwargs.get(ATTR_INPUT_SOURCE),
+                preset=kwargs.get(ATTR_SOUND_MODE),
+                volume=kwargs.get(ATTR_MEDIA_VOLUME_LEVEL),
+                mute=kwargs.get(ATTR_MEDIA_VOLUME_MUTED),
+            ):
+                raise HomeAssistantError(f"{client.host} did not accept the new state")
+
+        await async_get_hub(self.hass).async_call_group(self.entity_id, set_state)
+
+    async def async_wire_trace(self, enabled: bool, sample: int) -> None:
+        """Turn logging of every message to and from the speakers on or off."""
+        self.coordinator.client.set_wire_trace(enabled, sample)
+
+    async def async_join_players(self, group_members: list[str]) -> None:
+        """Group other Dutch & Dutch players with this one."""
+        async_get_hub(self.hass).async_join(self.entity_id, group_members)
+
+    async def async_unjoin_player(self) -> None:
+        """Remove this player from any group."""
+        async_get_hub(self.hass).async_unjoin(self.entity_id)
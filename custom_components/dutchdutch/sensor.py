@@ -0,0 +1,129 @@
+"""Statistics sensors for Dutch & Dutch speakers."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import CONF_STATISTICS, DOMAIN
+from .dutchdutch_api import DutchDutchApi
+from .dutchdutch_stats import DutchDutchStats
+
+# The statistics are only read from memory, so this is cheap
+SCAN_INTERVAL = timedelta(seconds=30)
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Convert a time in seconds to milliseconds."""
+    return None if seconds is None else seconds * 1000
+
+
+@dataclass(frozen=True, kw_only=True)
+class DutchDutchSensorEntityDescription(SensorEntityDescription):
+    """Describes a Dutch & Dutch statistics sensor."""
+
+    value_fn: Callable[[DutchDutchStats], float | int | None]
+
+
+SENSORS: tuple[DutchDutchSensorEntityDescription, ...] = (
+    DutchDutchSensorEntityDescription(
+        key="frames_received",
+        translation_key="frames_received",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.frames_received,
+    ),
+    DutchDutchSensorEntityDescription(
+        key="frames_discarded",
+        translation_key="frames_discarded",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.frames_discarded,
+    ),
+    DutchDutchSensorEntityDescription(
+        key="notifications",
+        translation_key="notifications",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.notifications,
+    ),
+    DutchDutchSensorEntityDescription(
+        key="reconnects",
+        translation_key="reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.reconnects,
+    ),
+    DutchDutchSensorEntityDescription(
+        key="command_latency",
+        translation_key="command_latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=1,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: _milliseconds(stats.command_latency),
+    ),
+    DutchDutchSensorEntityDescription(
+        key="update_time",
+        translation_key="update_time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        # deriving the state from a frame usually takes well under a millisecond
+        suggested_display_precision=3,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: _milliseconds(stats.update_time.percentile(0.5)),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the statistics sensors, if they've been turned on."""
+    if not entry.options.get(CONF_STATISTICS, False):
+        return
+    client: DutchDutchApi = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        DutchDutchStatsSensor(client, entry, description) for description in SENSORS
+    )
+
+
+class DutchDutchStatsSensor(SensorEntity):
+    """A figure from the statistics the API collects."""
+
+    entity_description: DutchDutchSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        client: DutchDutchApi,
+        entry: ConfigEntry,
+        description: DutchDutchSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._client = client
+        self._attr_unique_id = f"{entry.unique_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, str(entry.unique_id))})
+
+    @property
+    def available(self) -> bool:
+        """Return True while statistics are being collected."""
+        return self._client.stats is not None
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current value."""
+        if (stats := self._client.stats) is None:
+            return None
+        return self.entity_description.value_fn(stats)